@@ -11,22 +11,43 @@ Each entry describes:
 Usage:
     python zarr_catalog.py              # run all probes, print report
     python zarr_catalog.py --json       # emit JSON
-    python zarr_catalog.py --gdal       # also test via GDAL multidim CLI
+    python zarr_catalog.py --spec       # emit the catalog spec as JSON, no probing
+    python zarr_catalog.py --gdal       # also test via GDAL multidim (osgeo or gdalmdiminfo)
     python zarr_catalog.py --ids pangeo-gpcp mur-sst-aws   # specific entries
     python zarr_catalog.py --skip-slow  # skip entries known to take >30s
+    python zarr_catalog.py --workers 4 --timeout 60   # probe concurrency / per-entry limit
+    python zarr_catalog.py --cache ~/.cache/zarr_catalog  # reuse results for unchanged stores
+    python zarr_catalog.py --deep       # full xarray open instead of metadata-only probe
+    python zarr_catalog.py --async      # probe Zarr stores as coroutines on one event loop
+    ZARR_CATALOG_CACHE=1 python zarr_catalog.py   # keep metadata in ~/.cache/zarr_catalog
 
-Requires: xarray, zarr, fsspec, gcsfs, s3fs, aiohttp
+Requires: xarray, zarr>=3, fsspec, gcsfs, s3fs, aiohttp
 Optional: imagecodecs (for S1 coherence), planetary_computer (for PC entries),
-          cftime (for CMIP6 calendar decoding)
+          cftime (for CMIP6 calendar decoding), osgeo (in-process --gdal),
+          orjson (faster --json)
 """
 
 import argparse
+import asyncio
+import concurrent.futures
+import functools
+import hashlib
+import inspect
 import json
+import os
+import pickle
+import selectors
+import subprocess
 import time
 import sys
+import textwrap
+import threading
 import traceback
-from dataclasses import dataclass, field, asdict
-from typing import Optional
+from itertools import groupby
+from operator import attrgetter
+from urllib.parse import urlparse
+from dataclasses import dataclass, field, asdict, is_dataclass, replace
+from typing import Iterator, Optional
 
 # Register imagecodecs numcodecs plugins if available (needed for S1 coherence)
 try:
@@ -35,13 +56,83 @@ try:
 except ImportError:
     pass
 
+import fsspec
 import xarray as xr
+from fsspec.implementations.reference import ReferenceFileSystem
+
+# zarr-python 3 async API: fetch array metadata concurrently instead of one by one
+try:
+    import zarr
+    import zarr.api.asynchronous as zarr_async
+    from zarr.core.sync import sync as zarr_sync
+    from zarr.storage import FsspecStore, WrapperStore
+except ImportError:
+    zarr_async = None
+    WrapperStore = object
+
+
+def _default(obj):
+    if is_dataclass(obj):
+        return asdict(obj)
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+# orjson serialises dataclasses natively and several times faster than json;
+# OPT_NON_STR_KEYS matches json's handling of int keys (e.g. in open_kwargs chunks)
+try:
+    import orjson
+
+    _ORJSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+    def _dumps(obj):
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS).decode()
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, default=_default, indent=2)
+
+# Optional backends, imported once here rather than inside each probe, where
+# the first wave of worker threads would serialise on the import lock.
+# A probe that needs a missing one reports skip-deps.
+try:
+    import s3fs
+except ImportError:
+    s3fs = None
+try:
+    import gcsfs
+except ImportError:
+    gcsfs = None
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+try:
+    import h5netcdf
+except ImportError:
+    h5netcdf = None
+try:
+    import adlfs
+    import planetary_computer
+except ImportError:
+    adlfs = planetary_computer = None
+
+# In-process GDAL for --gdal: libgdal, drivers and /vsicurl connections are
+# set up once rather than per gdalmdiminfo subprocess
+try:
+    from osgeo import gdal
+    gdal.UseExceptions()
+except ImportError:
+    gdal = None
+
+# Let concurrent /vsicurl reads to one host share an HTTP/2 connection.
+# Applied only around --gdal probes (thread-local, or --config for
+# gdalmdiminfo), so importing this module leaves GDAL's settings alone.
+GDAL_PROBE_CONFIG = {"GDAL_HTTP_MULTIPLEX": "YES", "GDAL_HTTP_VERSION": "2"}
 
 # ---------------------------------------------------------------------------
 # Catalog entries
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class ZarrEntry:
     """One public Zarr endpoint."""
     id: str
@@ -50,11 +141,17 @@ class ZarrEntry:
     zarr_version: str          # "V2", "V3", "kerchunk-json", "kerchunk-parquet"
     access_protocol: str       # "https", "gs", "s3", "reference-json", "reference-parquet"
     store_url: str             # primary URL / URI
-    open_kwargs: dict = field(default_factory=dict)
+    open_kwargs: dict = field(default_factory=dict)       # passed to xarray as is
+    storage_options: dict = field(default_factory=dict)   # reference stores: remote_/target_ protocol+options
+    needs_cftime: bool = False     # non-standard calendar: decode times with cftime
     variable_hint: str = ""
     description: str = ""
     notes: str = ""
     gdal_dsn: str = ""
+    weight: int = 1                # relative metadata open cost; heavy entries are probed first
+    open_timeout: float = 0.0      # seconds allowed for the open itself (0 = no limit)
+    open_strategy: str = ""        # "zarr-only": never build an xarray Dataset, even with --deep;
+                                   # "xarray": always build one, even without --deep
     # --- populated by probe ---
     status: str = "untested"
     elapsed_s: float = 0.0
@@ -62,12 +159,14 @@ class ZarrEntry:
     dims_found: dict = field(default_factory=dict)
 
 
-CATALOG = [
+# Plain dicts: JSON-serialisable as is, and no ZarrEntry is built until a
+# run needs one (see iter_entries)
+CATALOG_SPEC = (
 
     # -----------------------------------------------------------------------
     # 1. PANGEO / OSN — classic Zarr V2, HTTP (consolidated)
     # -----------------------------------------------------------------------
-    ZarrEntry(
+    dict(
         id="pangeo-gpcp",
         name="GPCP Daily Precipitation (Pangeo Forge)",
         provider="Pangeo / OSN",
@@ -84,7 +183,7 @@ CATALOG = [
     # 2-3. CMIP6 on Google Cloud — Zarr V2, GCS anonymous
     # These stores use noleap calendars -> need decode_times=False or cftime
     # -----------------------------------------------------------------------
-    ZarrEntry(
+    dict(
         id="cmip6-gcs-zos",
         name="CMIP6 Sea Surface Height (GFDL-ESM4, ssp585)",
         provider="CMIP6 / Google Cloud",
@@ -92,11 +191,12 @@ CATALOG = [
         access_protocol="gs",
         store_url="gs://cmip6/CMIP6/ScenarioMIP/NOAA-GFDL/GFDL-ESM4/ssp585/r1i1p1f1/Omon/zos/gn/v20180701/",
         # noleap calendar: use CFDatetimeCoder for modern xarray
-        open_kwargs=dict(consolidated=True, chunks={}, _needs_cftime=True),
+        open_kwargs=dict(consolidated=True, chunks={}),
+        needs_cftime=True,
         variable_hint="zos",
         description="Monthly sea surface height, SSP5-8.5, 2015-2100.",
     ),
-    ZarrEntry(
+    dict(
         id="cmip6-highres-psl",
         name="CMIP6 HighResMIP Sea Level Pressure (CMCC-CM2-HR4)",
         provider="CMIP6 / Google Cloud",
@@ -104,7 +204,8 @@ CATALOG = [
         access_protocol="gs",
         store_url="gs://cmip6/CMIP6/HighResMIP/CMCC/CMCC-CM2-HR4/highresSST-present/r1i1p1f1/6hrPlev/psl/gn/v20170706/",
         # noleap calendar: use CFDatetimeCoder for modern xarray
-        open_kwargs=dict(consolidated=True, chunks={}, _needs_cftime=True),
+        open_kwargs=dict(consolidated=True, chunks={}),
+        needs_cftime=True,
         variable_hint="psl",
         description="6-hourly sea level pressure from high-resolution CMCC model.",
     ),
@@ -112,7 +213,7 @@ CATALOG = [
     # -----------------------------------------------------------------------
     # ARCO-ERA5 on Google Cloud
     # -----------------------------------------------------------------------
-    ZarrEntry(
+    dict(
         id="arco-era5-single-level",
         name="ARCO-ERA5 Single-Level Reanalysis",
         provider="Google Research / ECMWF",
@@ -123,8 +224,11 @@ CATALOG = [
         variable_hint="2m_temperature",
         description="ERA5 hourly reanalysis, 0.25deg global, 1959-2022. Very large (~2 PB logical).",
         notes="Opening metadata can be slow (~8s) due to hundreds of variables.",
+        weight=10,
+        open_timeout=90.0,
+        open_strategy="zarr-only",
     ),
-    ZarrEntry(
+    dict(
         id="arco-era5-v3",
         name="ARCO-ERA5 Full 37-level (dataset version 3)",
         provider="Google Research / ECMWF",
@@ -135,12 +239,15 @@ CATALOG = [
         variable_hint="2m_temperature",
         description="ERA5 full 37-level, hourly, 0.25deg — dataset version 3 (still Zarr V2 format).",
         notes="Very slow to open metadata (~90s). Test with --skip-slow.",
+        weight=10,
+        open_timeout=90.0,
+        open_strategy="zarr-only",
     ),
 
     # -----------------------------------------------------------------------
     # WeatherBench2
     # -----------------------------------------------------------------------
-    ZarrEntry(
+    dict(
         id="weatherbench2-era5",
         name="WeatherBench2 ERA5 (6-hourly, 1.5deg)",
         provider="Google Research / WeatherBench2",
@@ -150,12 +257,13 @@ CATALOG = [
         open_kwargs=dict(chunks={}, consolidated=True),
         variable_hint="2m_temperature",
         description="ERA5 reanalysis downsampled to 1.5deg for ML weather benchmarking.",
+        weight=10,
     ),
 
     # -----------------------------------------------------------------------
     # S3 stores — use s3fs mapper for robustness
     # -----------------------------------------------------------------------
-    ZarrEntry(
+    dict(
         id="cmip6-s3-hfls",
         name="CMIP6 Surface Upward Latent Heat Flux (TaiESM1, 1pctCO2)",
         provider="CMIP6 / AWS S3",
@@ -163,12 +271,13 @@ CATALOG = [
         access_protocol="s3",
         store_url="s3://cmip6-pds/CMIP6/CMIP/AS-RCEC/TaiESM1/1pctCO2/r1i1p1f1/Amon/hfls/gn/v20200225/",
         # noleap calendar: needs cftime for time decoding
-        open_kwargs=dict(consolidated=True, chunks={}, _needs_cftime=True),
+        open_kwargs=dict(consolidated=True, chunks={}),
+        needs_cftime=True,
         variable_hint="hfls",
         description="Monthly latent heat flux from 1pctCO2 experiment.",
     ),
 
-    ZarrEntry(
+    dict(
         id="mur-sst-aws",
         name="MUR SST L4 Global (JPL, NASA)",
         provider="NASA JPL / AWS Open Data",
@@ -181,7 +290,7 @@ CATALOG = [
         gdal_dsn='ZARR:"/vsicurl/https://mur-sst.s3.us-west-2.amazonaws.com/zarr-v1"',
     ),
 
-    ZarrEntry(
+    dict(
         id="hrrr-zarr-aws",
         name="HRRR Weather Model (surface analysis, TMP)",
         provider="NOAA / AWS Open Data",
@@ -194,7 +303,7 @@ CATALOG = [
         notes="Use group='surface/VARNAME' to select variable.",
     ),
 
-    ZarrEntry(
+    dict(
         id="its-live",
         name="ITS_LIVE Ice Velocity Datacube",
         provider="NASA MEaSUREs / AWS",
@@ -209,7 +318,7 @@ CATALOG = [
         notes="Tile path needs verification: run fs.ls('s3://its-live-data/datacubes/v2/N00E020/').",
     ),
 
-    ZarrEntry(
+    dict(
         id="nasa-power",
         name="NASA POWER Daily Meteorology (MERRA-2, spatial)",
         provider="NASA POWER / AWS Open Data",
@@ -223,7 +332,7 @@ CATALOG = [
         notes="Bucket moved from power-analysis-ready-datastore to nasa-power in 2024.",
     ),
 
-    ZarrEntry(
+    dict(
         id="nwm-zarr",
         name="National Water Model Reanalysis v2.1",
         provider="NOAA / AWS Open Data",
@@ -238,14 +347,14 @@ CATALOG = [
     # -----------------------------------------------------------------------
     # Kerchunk JSON references — use xr.open_dataset("reference://", ...)
     # -----------------------------------------------------------------------
-    ZarrEntry(
+    dict(
         id="oisst-kerchunk",
         name="NOAA OISST CDR (via Kerchunk JSON reference)",
         provider="Pangeo Forge / NOAA",
         zarr_version="kerchunk-json",
         access_protocol="reference-json",
         store_url="https://ncsa.osn.xsede.org/Pangeo/pangeo-forge/pangeo-forge/aws-noaa-oisst-feedstock/aws-noaa-oisst-avhrr-only.zarr/reference.json",
-        open_kwargs=dict(
+        storage_options=dict(
             remote_protocol="s3",
             remote_options=dict(anon=True),
         ),
@@ -254,14 +363,14 @@ CATALOG = [
         notes="Underlying data is NetCDF on S3. remote_options={'anon': True} required.",
     ),
 
-    ZarrEntry(
+    dict(
         id="s1-coherence-kerchunk",
         name="Sentinel-1 Global Coherence (kerchunk, Earth Big Data)",
         provider="Earth Big Data / ASF",
         zarr_version="kerchunk-json",
         access_protocol="reference-json",
         store_url="https://sentinel-1-global-coherence-earthbigdata.s3.us-west-2.amazonaws.com/data/wrappers/zarr-all.json",
-        open_kwargs=dict(
+        storage_options=dict(
             target_protocol="http",
             remote_protocol="http",
         ),
@@ -273,7 +382,7 @@ CATALOG = [
     # -----------------------------------------------------------------------
     # Planetary Computer — needs pystac signing
     # -----------------------------------------------------------------------
-    ZarrEntry(
+    dict(
         id="pc-daymet",
         name="Daymet V4 Daily (Planetary Computer, Azure)",
         provider="Microsoft Planetary Computer",
@@ -285,7 +394,7 @@ CATALOG = [
         description="Daymet V4 daily maximum temperature, North America, on Azure Blob.",
         notes="Requires planetary_computer and adlfs. pip install planetary-computer adlfs",
     ),
-    ZarrEntry(
+    dict(
         id="pc-era5",
         name="ERA5 (Planetary Computer, Azure) [RETIRED]",
         provider="Microsoft Planetary Computer / ECMWF",
@@ -301,7 +410,7 @@ CATALOG = [
     # -----------------------------------------------------------------------
     # Copernicus Marine — ARCO stores (no auth, direct HTTPS)
     # -----------------------------------------------------------------------
-    ZarrEntry(
+    dict(
         id="copernicus-marine-sla",
         name="Copernicus Marine Sea Level (ARCO timeChunked)",
         provider="Copernicus Marine / Mercator Ocean",
@@ -325,7 +434,7 @@ CATALOG = [
     # -----------------------------------------------------------------------
     # NetCDF source for kerchunk/VirtualiZarr demonstration
     # -----------------------------------------------------------------------
-    ZarrEntry(
+    dict(
         id="nex-gddp-cmip6",
         name="NEX-GDDP-CMIP6 (bias-corrected daily, NetCDF on S3)",
         provider="NASA / AWS Open Data",
@@ -338,36 +447,174 @@ CATALOG = [
         notes="Not a Zarr store. Open with fsspec + h5netcdf.",
     ),
 
-]
+)
+
+
+def iter_entries() -> Iterator[ZarrEntry]:
+    """Yield a fresh ZarrEntry per catalog spec."""
+    for spec in CATALOG_SPEC:
+        yield ZarrEntry(**spec)
 
 
 # ---------------------------------------------------------------------------
 # Probe logic
 # ---------------------------------------------------------------------------
 
+# One filesystem instance per (protocol, storage_options), shared by all probes.
+# fsspec's own instance cache includes the thread id, so under run_catalog's
+# thread pool every worker would otherwise build its own S3FileSystem /
+# GCSFileSystem (config parsing, aiobotocore session, credential lookup) and
+# open fresh TCP/TLS connections. Sync instances run their I/O on fsspec's
+# single loop thread and async ones on zarr's, so sharing them across worker
+# threads is safe.
+_FS_CACHE = {}
+_FS_LOCK = threading.Lock()
+
+
+# aiohttp connection pool bounds for HTTP(S) filesystems
+HTTP_POOL_LIMIT = 256
+HTTP_HOST_LIMIT = 64
+
+
+async def _get_http_client(**kwargs):
+    """aiohttp session for HTTP(S) filesystems, tuned to keep connections warm.
+
+    aiohttp only speaks HTTP/1.1, so connection reuse is what saves TCP/TLS
+    handshakes: idle sockets are kept for a minute and DNS answers cached,
+    and since filesystems are shared (see _get_fs) one pool serves every
+    probe against the same host. aiohttp's default pool of 100 connections
+    total is raised so concurrent GETs (zarr's batched reads, kerchunk chunk
+    fetches) queue per host rather than globally.
+    """
+    connector = aiohttp.TCPConnector(limit=HTTP_POOL_LIMIT, limit_per_host=HTTP_HOST_LIMIT,
+                                     keepalive_timeout=60, ttl_dns_cache=300)
+    return aiohttp.ClientSession(connector=connector, **kwargs)
+
+
+def _get_fs(protocol, opts=None, asynchronous=False):
+    """Return the shared fsspec filesystem for protocol + storage options."""
+    opts = dict(opts or {})
+    if protocol in ("http", "https"):
+        opts.setdefault("get_client", _get_http_client)
+    key = (protocol, frozenset(opts.items()), asynchronous)
+    with _FS_LOCK:
+        fs = _FS_CACHE.get(key)
+        if fs is None:
+            fs = fsspec.filesystem(protocol, asynchronous=asynchronous,
+                                   skip_instance_cache=True, **opts)
+            _FS_CACHE[key] = fs
+    return fs
+
+
+# On-disk cache for metadata documents (.zmetadata, .zarray, .zattrs,
+# reference JSON) across runs: ZARR_CATALOG_CACHE names the directory, or
+# "1" for the default location. Disabled with --no-cache.
+DEFAULT_METADATA_CACHE = os.path.expanduser("~/.cache/zarr_catalog")
+METADATA_CACHE_DIR = os.environ.get("ZARR_CATALOG_CACHE") or None
+if METADATA_CACHE_DIR == "1":
+    METADATA_CACHE_DIR = DEFAULT_METADATA_CACHE
+
+
+def _metadata_fs(protocol, opts=None):
+    """Filesystem for metadata reads: the shared one, behind a file cache if enabled.
+
+    check_files makes the cache compare each file's remote checksum, so a
+    warm run costs a HEAD per document rather than a download.
+    """
+    fs = _get_fs(protocol, opts)
+    if METADATA_CACHE_DIR is None or protocol not in ("s3", "gs", "gcs", "http", "https"):
+        return fs
+    key = ("filecache", protocol, frozenset((opts or {}).items()), METADATA_CACHE_DIR)
+    with _FS_LOCK:
+        cached = _FS_CACHE.get(key)
+        if cached is None:
+            cached = fsspec.filesystem("filecache", fs=fs, cache_storage=METADATA_CACHE_DIR,
+                                       check_files=True, skip_instance_cache=True)
+            _FS_CACHE[key] = cached
+    return cached
+
+
+@functools.lru_cache(maxsize=8)
+def _s3fs(anon=True, endpoint_url=None):
+    """Shared S3FileSystem (anonymous by default) for every S3 probe."""
+    opts = {"anon": anon}
+    if endpoint_url:
+        opts["endpoint_url"] = endpoint_url
+    return _get_fs("s3", opts)
+
+
+@functools.lru_cache(maxsize=8)
+def _gcsfs(token="anon"):
+    """Shared GCSFileSystem (anonymous by default) for every GCS probe."""
+    return _get_fs("gs", {"token": token})
+
+
+def _warm_filesystems():
+    """Build the shared S3/GCS/HTTPS filesystems and their client sessions.
+
+    Run on a background thread while the catalog is assembled, so the first
+    probe against each backend doesn't pay for session setup (aiobotocore /
+    aiohttp client creation, credential lookup). A failure is noted on
+    stderr and otherwise left for the probes themselves to report.
+    """
+    # network and configuration errors; anything else is a bug and propagates
+    expected = (OSError, ValueError, asyncio.TimeoutError) + ((aiohttp.ClientError,) if aiohttp else ())
+    backends = [("s3", s3fs, _s3fs), ("gs", gcsfs, _gcsfs), ("https", aiohttp, lambda: _get_fs("https"))]
+    for name, module, make in backends:
+        if module is None:
+            continue
+        try:
+            fs = make()
+            set_session = getattr(fs, "set_session", None) or fs._set_session
+            fsspec.asyn.sync(fs.loop, set_session)
+        except expected as exc:
+            print(f"warning: couldn't pre-start the {name} session: "
+                  f"{type(exc).__name__}: {exc}", file=sys.stderr)
+
+
 def _open_s3_zarr(url, **kwargs):
     """Open an S3 Zarr store via s3fs mapper."""
-    import s3fs
-    fs = s3fs.S3FileSystem(anon=True)
-    mapper = fs.get_mapper(url)
+    mapper = _s3fs().get_mapper(url)
     return xr.open_zarr(mapper, **kwargs)
 
 
-def _open_reference_json(fo, remote_protocol="s3", remote_options=None,
-                         target_protocol=None, target_options=None):
-    """Open a kerchunk JSON reference store."""
-    storage_options = dict(fo=fo, remote_protocol=remote_protocol)
-    if remote_options:
-        storage_options["remote_options"] = remote_options
-    if target_protocol:
-        storage_options["target_protocol"] = target_protocol
-    if target_options:
-        storage_options["target_options"] = target_options
-    return xr.open_dataset(
-        "reference://", engine="zarr",
-        backend_kwargs=dict(consolidated=False, storage_options=storage_options),
-        chunks={}
+def _open_gs_zarr(url, **kwargs):
+    """Open a GCS Zarr store via gcsfs mapper."""
+    return xr.open_zarr(_gcsfs().get_mapper(url), **kwargs)
+
+
+def _open_https_zarr(url, **kwargs):
+    """Open a Zarr store over plain HTTP(S)."""
+    return xr.open_zarr(_get_fs("https").get_mapper(url), **kwargs)
+
+
+def _load_reference(url, target_protocol=None, target_options=None):
+    """Fetch and parse a kerchunk JSON reference with a single GET.
+
+    Handing ReferenceFileSystem the URL lets it HEAD the file before reading
+    it; fetching the bytes ourselves through the shared filesystem skips that
+    round trip.
+    """
+    protocol = target_protocol or fsspec.utils.get_protocol(url)
+    return json.loads(_metadata_fs(protocol, target_options).cat_file(url))
+
+
+def _reference_store(fo, remote_protocol="s3", remote_options=None,
+                     target_protocol=None, target_options=None):
+    """Read-only zarr store over a kerchunk JSON reference."""
+    refs = _load_reference(fo, target_protocol, target_options)
+    # async, so zarr can use it directly; chunk reads go through the shared
+    # remote filesystem rather than one built per reference store
+    ref_fs = ReferenceFileSystem(
+        fo=refs, asynchronous=True,
+        fs={remote_protocol: _get_fs(remote_protocol, remote_options, asynchronous=True)},
     )
+    return FsspecStore(ref_fs, read_only=True, path="")
+
+
+def _open_reference_json(fo, **options):
+    """Open a kerchunk JSON reference store."""
+    return xr.open_zarr(_reference_store(fo, **options), consolidated=False, chunks={})
 
 
 def _open_reference_parquet(fo, remote_protocol="s3", remote_options=None,
@@ -389,9 +636,7 @@ def _open_reference_parquet(fo, remote_protocol="s3", remote_options=None,
 
 def _open_netcdf_s3(url):
     """Open a NetCDF file on S3 via fsspec file handle."""
-    import s3fs
-    fs = s3fs.S3FileSystem(anon=True)
-    f = fs.open(url)
+    f = _s3fs().open(url)
     return xr.open_dataset(f, engine="h5netcdf", chunks={})
 
 
@@ -401,9 +646,8 @@ def _open_pc_zarr(url, **kwargs):
     Signs one URL to extract the SAS token, then passes it directly
     to AzureBlobFileSystem so every request is authenticated.
     """
-    import planetary_computer
-    import adlfs
-    from urllib.parse import urlparse, parse_qs
+    if planetary_computer is None or adlfs is None:
+        raise ImportError("planetary_computer and/or adlfs not installed")
 
     # Sign a URL to extract the SAS token
     signed_url = planetary_computer.sign(url)
@@ -423,118 +667,874 @@ def _open_pc_zarr(url, **kwargs):
     return xr.open_zarr(mapper, **kwargs)
 
 
-def probe_xarray(entry: ZarrEntry) -> ZarrEntry:
-    """Try to open the Zarr store with xarray and extract basic metadata."""
+# Upper bound on concurrent metadata requests within one probe
+PROBE_CONCURRENCY = 32
+
+# Anonymous access for zarr-native opens, by access_protocol
+ZARR_STORAGE_OPTIONS = {
+    "s3": {"anon": True},
+    "gs": {"token": "anon"},
+    "https": {},
+}
+
+
+# Concurrent requests allowed per host (bucket, for gs:// and s3://) across
+# all probes, so parallel probes against one endpoint don't trip rate limits
+DEFAULT_HOST_CONCURRENCY = 6
+HOST_CONCURRENCY = {
+    "gs": 16,                       # GCS per-bucket quotas are generous
+    "ncsa.osn.xsede.org": 4,        # small OSN pod
+}
+# host -> _HostLimiter, shared by every store and filesystem read
+_HOST_LIMITERS = {}
+_HOST_LIMITERS_LOCK = threading.Lock()
+
+
+def _host_limit(url):
+    """(host, max concurrent requests) for a store URL."""
+    parsed = urlparse(url)
+    return parsed.netloc, HOST_CONCURRENCY.get(
+        parsed.netloc, HOST_CONCURRENCY.get(parsed.scheme, DEFAULT_HOST_CONCURRENCY))
+
+
+class _HostLimiter:
+    """
+    Cap on in-flight requests to one host, for coroutines and threads alike.
+
+    The semaphore lives on zarr's event loop: coroutines there use
+    ``async with``, threads use ``with``, which waits for a slot via
+    zarr_sync. Either way a request counts against the same limit. Without
+    zarr 3 there is no loop and threads share a plain semaphore instead.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+        self._thread_semaphore = threading.BoundedSemaphore(limit)
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+
+    async def __aexit__(self, *exc):
+        self._semaphore.release()
+
+    async def _release(self):
+        self._semaphore.release()
+
+    def __enter__(self):
+        if zarr_async is None:
+            self._thread_semaphore.acquire()
+        else:
+            zarr_sync(self._semaphore.acquire())
+
+    def __exit__(self, *exc):
+        if zarr_async is None:
+            self._thread_semaphore.release()
+        else:
+            zarr_sync(self._release())
+
+
+def _host_limiter(url):
+    """The shared _HostLimiter for url's host."""
+    host, limit = _host_limit(url)
+    with _HOST_LIMITERS_LOCK:
+        return _HOST_LIMITERS.setdefault(host, _HostLimiter(limit))
+
+
+class HostLimitedStore(WrapperStore):
+    """
+    zarr store wrapper that shares one limiter per host across every store.
+
+    All zarr I/O runs on zarr's single event loop, so the limiter caps
+    in-flight requests (GETs, HEADs and listings) to the host no matter how
+    many probes are running; _fetch_metadata's reads take the same limiter.
+    """
+
+    def __init__(self, store, url):
+        super().__init__(store)
+        self.url = url
+        self._limiter = _host_limiter(url)
+
+    def _with_store(self, store):
+        return type(self)(store, self.url)
+
+    async def get(self, key, prototype, byte_range=None):
+        async with self._limiter:
+            return await self._store.get(key, prototype, byte_range)
+
+    async def get_partial_values(self, prototype, key_ranges):
+        return await asyncio.gather(*(self.get(k, prototype, r) for k, r in key_ranges))
+
+    async def exists(self, key):
+        async with self._limiter:
+            return await self._store.exists(key)
+
+    async def getsize(self, key):
+        async with self._limiter:
+            return await self._store.getsize(key)
+
+    async def _listed(self, listing):
+        async with self._limiter:
+            keys = [key async for key in listing]
+        for key in keys:
+            yield key
+
+    def list(self):
+        return self._listed(self._store.list())
+
+    def list_prefix(self, prefix):
+        return self._listed(self._store.list_prefix(prefix))
+
+    def list_dir(self, prefix):
+        return self._listed(self._store.list_dir(prefix))
+
+
+async def _open_zarr_arrays_async(store, path=None, zarr_format=None,
+                                  use_consolidated=None):
+    """Open a Zarr group and return {name: AsyncArray} for its arrays.
+
+    Without consolidated metadata zarr fetches each member's .zarray /
+    zarr.json concurrently (up to PROBE_CONCURRENCY at once) rather than one
+    round trip after another.
+    """
+    with zarr.config.set({"async.concurrency": PROBE_CONCURRENCY}):
+        group = await zarr_async.open_group(
+            store=store, mode="r", path=path, zarr_format=zarr_format,
+            use_consolidated=use_consolidated,
+        )
+        return {name: node async for name, node in group.members() if hasattr(node, "shape")}
+
+
+def _zarr_store(entry):
+    """Read-only zarr store for entry on the shared async filesystem, host-limited."""
+    fs = _get_fs(entry.access_protocol, ZARR_STORAGE_OPTIONS[entry.access_protocol],
+                 asynchronous=True)
+    return HostLimitedStore(
+        FsspecStore(fs, read_only=True, path=fs._strip_protocol(entry.store_url)),
+        entry.store_url,
+    )
+
+
+def _open_zarr_arrays(entry, kw):
+    """Synchronous wrapper: run the async open on zarr's event loop."""
+    return zarr_sync(_open_zarr_arrays_async(
+        _zarr_store(entry),
+        path=kw.get("group"),
+        zarr_format=kw.get("zarr_format"),
+        use_consolidated=kw.get("consolidated"),
+    ))
+
+
+# Errors zarr / xarray raise when consolidated metadata was requested but is absent
+_NO_CONSOLIDATED = (KeyError, ValueError, FileNotFoundError)
+
+
+def _is_missing_consolidated(exc):
+    """True if exc means only that the store has no consolidated metadata.
+
+    V3 says "Consolidated metadata requested ... but not found"; V2 names the
+    missing .zmetadata key. Anything else (a bad group, a decode error) is a
+    real failure and must not be retried as unconsolidated.
+    """
+    return isinstance(exc, _NO_CONSOLIDATED) and (
+        "Consolidated metadata requested" in str(exc) or ".zmetadata" in str(exc))
+
+
+def _open_consolidated_first(entry, open_fn, kw):
+    """Call open_fn(kw) with consolidated=True, retrying unconsolidated on a miss.
+
+    A store with .zmetadata (or consolidated zarr.json) opens in one GET
+    instead of a LIST plus a .zarray/.zattrs fetch per variable, so try that
+    first even where the catalog entry says consolidated=False. The branch
+    taken is recorded in entry.notes.
+    """
+    try:
+        result = open_fn({**kw, "consolidated": True})
+    except _NO_CONSOLIDATED as exc:
+        if not _is_missing_consolidated(exc):
+            raise
+        result = open_fn({**kw, "consolidated": False})
+        entry.notes += " Opened unconsolidated (no consolidated metadata)."
+    else:
+        entry.notes += " Opened consolidated."
+    return result
+
+
+def _dims_from_arrays(arrays):
+    """Dimension sizes from array metadata (V3 dimension_names or V2 _ARRAY_DIMENSIONS)."""
+    dims = {}
+    for arr in arrays.values():
+        names = getattr(arr.metadata, "dimension_names", None) or arr.attrs.get("_ARRAY_DIMENSIONS", ())
+        dims.update({str(n): int(size) for n, size in zip(names, arr.shape)})
+    return dims
+
+
+def _parse_json(value):
+    """Metadata documents may be inlined as dicts or as JSON strings (kerchunk)."""
+    return json.loads(value) if isinstance(value, (str, bytes)) else value
+
+
+def _arrays_from_metadata(meta, group=None):
+    """{name: (shape, dimension names)} for the arrays directly under group.
+
+    meta is either V2 consolidated metadata / kerchunk refs ({"var/.zarray":
+    ..., "var/.zattrs": ...}) or V3 consolidated metadata ({"var": {...}}).
+    """
+    prefix = f"{group.strip('/')}/" if group else ""
+    arrays = {}
+    for key, value in meta.items():
+        if not key.startswith(prefix):
+            continue
+        name = key[len(prefix):]
+        if name.endswith("/.zarray"):
+            name = name[:-len("/.zarray")]
+            attrs = _parse_json(meta.get(f"{prefix}{name}/.zattrs", {}))
+            names = attrs.get("_ARRAY_DIMENSIONS", ())
+        elif "/" not in name and isinstance(value, dict) and value.get("node_type") == "array":
+            names = value.get("dimension_names") or ()
+        else:
+            continue
+        if "/" not in name:
+            arrays[name] = (tuple(_parse_json(value)["shape"]), names)
+    return arrays
+
+
+def _cat_many(fs, paths, limiter):
+    """{path: bytes} for those of paths that exist, at most limiter.limit at a time.
+
+    Each GET holds a slot in the host's limiter, so these reads share the
+    per-host cap with every other probe.
+    """
+    def get(path):
+        try:
+            with limiter:
+                return path, fs.cat_file(path)
+        except FileNotFoundError:
+            return path, None
+
+    with concurrent.futures.ThreadPoolExecutor(limiter.limit) as pool:
+        return {path: data for path, data in pool.map(get, paths) if data is not None}
+
+
+def _fetch_member_metadata(fs, url, zarr_version, group=None):
+    """Per-array metadata for an unconsolidated store: one LIST, one batched GET.
+
+    Returns a dict shaped like consolidated metadata, so _arrays_from_metadata
+    handles both.
+    """
+    prefix = f"{group.strip('/')}/" if group else ""
+    base = fs._strip_protocol(f"{url}/{prefix}").rstrip("/")
+    limiter = _host_limiter(url)
+    with limiter:
+        listing = fs.ls(base, detail=False)
+    names = [p.rsplit("/", 1)[-1] for p in listing]
+    if zarr_version == "V3":
+        keys = [f"{n}/zarr.json" for n in names if n != "zarr.json"]
+    else:
+        keys = [f"{n}/{doc}" for n in names if not n.startswith(".")
+                for doc in (".zarray", ".zattrs")]
+    found = _cat_many(fs, [f"{base}/{k}" for k in keys], limiter)
+    meta = {}
+    for path, data in found.items():
+        key = fs._strip_protocol(path)[len(base) + 1:]
+        meta[prefix + (key[:-len("/zarr.json")] if zarr_version == "V3" else key)] = json.loads(data)
+    return meta
+
+
+def _fetch_metadata(entry):
+    """Consolidated metadata (or kerchunk refs) for entry, or None.
+
+    One GET when the store is consolidated. Otherwise S3/GCS stores are
+    listed once and every member's metadata is fetched in a single batch.
+    Raises FileNotFoundError / KeyError when none of that is available.
+    """
+    if entry.access_protocol == "reference-json":
+        opts = entry.storage_options
+        refs = _load_reference(entry.store_url, opts.get("target_protocol"),
+                               opts.get("target_options"))
+        return refs.get("refs", refs)
+    if entry.access_protocol not in ZARR_STORAGE_OPTIONS:
+        return None
+    fs = _metadata_fs(entry.access_protocol, ZARR_STORAGE_OPTIONS[entry.access_protocol])
+    url = entry.store_url.rstrip("/")
+    try:
+        with _host_limiter(url):
+            if entry.zarr_version == "V3":
+                root = json.loads(fs.cat_file(f"{url}/zarr.json"))
+                return root["consolidated_metadata"]["metadata"]
+            return json.loads(fs.cat_file(f"{url}/.zmetadata"))["metadata"]
+    except (FileNotFoundError, KeyError, TypeError):
+        # plain HTTP has no listing; probe_xarray handles those stores
+        if entry.access_protocol == "https":
+            raise
+        return _fetch_member_metadata(fs, url, entry.zarr_version,
+                                      entry.open_kwargs.get("group"))
+
+
+def probe_metadata_only(entry: ZarrEntry) -> ZarrEntry:
+    """Smoke test from consolidated metadata alone, without opening the store.
+
+    Parses .zmetadata, consolidated zarr.json or the kerchunk reference JSON
+    directly: no codecs, no coordinate decoding, no listing. Entries without
+    consolidated metadata fall through to probe_xarray.
+    """
     t0 = time.time()
     try:
-        kw = dict(entry.open_kwargs)
+        meta = _fetch_metadata(entry)
+    except (FileNotFoundError, KeyError, ValueError, TypeError):
+        meta = None
+    except Exception as exc:
+        entry.status = "error"
+        entry.error = f"{type(exc).__name__}: {exc}"
+        entry.elapsed_s = round(time.time() - t0, 2)
+        return entry
+    arrays = _arrays_from_metadata(meta, entry.open_kwargs.get("group")) if meta else {}
+    if not arrays:
+        return probe_xarray(entry)
+
+    entry.dims_found = {str(n): int(size) for shape, names in arrays.values()
+                        for n, size in zip(names, shape)}
+    entry.status = "ok"
+    entry.notes += " Metadata-only probe."
+    if entry.variable_hint in arrays:
+        entry.notes += f" Variable '{entry.variable_hint}' shape={arrays[entry.variable_hint][0]}."
+    entry.elapsed_s = round(time.time() - t0, 2)
+    return entry
 
-        # --- Suppress timedelta FutureWarning ---
-        # xarray will change timedelta decoding default; be explicit
-        kw.setdefault("decode_timedelta", False)
 
-        # --- Handle _needs_cftime flag ---
+# entry.id -> open kwargs with probe defaults applied; resolved once per run
+_RESOLVED_KWARGS = {}
+
+
+def _resolved_kwargs(entry):
+    """entry.open_kwargs with decode defaults and needs_cftime applied.
+
+    Computed once per entry and shared, so treat the result as read-only.
+    """
+    kw = _RESOLVED_KWARGS.get(entry.id)
+    if kw is None:
+        # xarray will change timedelta decoding default; be explicit
+        kw = {"decode_timedelta": False, **entry.open_kwargs}
         # Modern xarray uses CFDatetimeCoder; older uses use_cftime kwarg
-        if kw.pop("_needs_cftime", False):
+        if entry.needs_cftime:
             try:
                 kw["decode_times"] = xr.coders.CFDatetimeCoder(use_cftime=True)
             except AttributeError:
                 # older xarray without coders module
                 kw["use_cftime"] = True
+        _RESOLVED_KWARGS[entry.id] = kw
+    return kw
 
-        # --- Dispatch by access_protocol ---
 
-        if entry.access_protocol == "auth-required":
-            entry.status = "skip-auth"
-            entry.elapsed_s = round(time.time() - t0, 2)
-            return entry
+@functools.lru_cache(maxsize=None)
+def _open_zarr_accepts(name):
+    """Whether this xarray's open_zarr takes keyword name."""
+    return name in inspect.signature(xr.open_zarr).parameters
 
-        elif entry.access_protocol == "pc-azure":
-            try:
-                ds = _open_pc_zarr(entry.store_url, **kw)
-            except ImportError:
-                entry.status = "skip-deps"
-                entry.error = "planetary_computer and/or adlfs not installed"
-                entry.elapsed_s = round(time.time() - t0, 2)
-                return entry
-
-        elif entry.access_protocol == "reference-json":
-            remote_protocol = kw.pop("remote_protocol", "s3")
-            remote_options = kw.pop("remote_options", None)
-            target_protocol = kw.pop("target_protocol", None)
-            target_options = kw.pop("target_options", None)
-            ds = _open_reference_json(
-                entry.store_url,
-                remote_protocol=remote_protocol,
-                remote_options=remote_options,
-                target_protocol=target_protocol,
-                target_options=target_options,
-            )
-
-        elif entry.access_protocol == "reference-parquet":
-            remote_protocol = kw.pop("remote_protocol", "s3")
-            remote_options = kw.pop("remote_options", None)
-            target_protocol = kw.pop("target_protocol", None)
-            target_options = kw.pop("target_options", None)
-            ds = _open_reference_parquet(
-                entry.store_url,
-                remote_protocol=remote_protocol,
-                remote_options=remote_options,
-                target_protocol=target_protocol,
-                target_options=target_options,
-            )
-
-        elif entry.access_protocol == "s3-netcdf":
-            ds = _open_netcdf_s3(entry.store_url)
-
-        elif entry.access_protocol == "s3":
-            ds = _open_s3_zarr(entry.store_url, **kw)
-
-        elif entry.access_protocol in ("gs", "https"):
-            ds = xr.open_zarr(entry.store_url, **kw)
 
+def _load_coords(ds, max_workers=16):
+    """Read all coordinate variables of ds concurrently, in place."""
+    names = list(ds.coords)
+    if names:
+        with concurrent.futures.ThreadPoolExecutor(min(max_workers, len(names))) as pool:
+            list(pool.map(lambda name: ds[name].load(), names))
+    return ds
+
+
+def _open_dataset(entry, open_fn, kw):
+    """xarray open with coordinate reads done in parallel rather than serially.
+
+    open_zarr loads every array backing an index one after another while
+    opening; where supported, skip that with create_default_indexes=False and
+    load the coordinates concurrently afterwards.
+    """
+    if not _open_zarr_accepts("create_default_indexes"):
+        return _open_consolidated_first(entry, open_fn, kw)
+    ds = _open_consolidated_first(entry, open_fn, {**kw, "create_default_indexes": False})
+    return _load_coords(ds)
+
+
+def _zarr_only(entry, deep):
+    """Whether to read array metadata with zarr instead of building a Dataset.
+
+    Dims and the hinted variable's shape don't need xarray's decoding or
+    index building, so that is the default; --deep (or open_strategy
+    "xarray") asks for the full Dataset.
+    """
+    if zarr_async is None or entry.open_strategy == "xarray":
+        return False
+    return not deep or entry.open_strategy == "zarr-only"
+
+
+# access_protocol -> open(url, **kwargs) returning an xr.Dataset, for V2/V3
+# stores opened through xarray
+_XARRAY_OPENERS = {
+    "s3": _open_s3_zarr,
+    "gs": _open_gs_zarr,
+    "https": _open_https_zarr,
+    "pc-azure": _open_pc_zarr,
+}
+
+
+def _open_zarr_store(entry, kw, deep):
+    """V2/V3 stores: zarr-native metadata read, or xarray for --deep / PC."""
+    if entry.access_protocol in ZARR_STORAGE_OPTIONS and _zarr_only(entry, deep):
+        return _open_consolidated_first(entry, lambda k: _open_zarr_arrays(entry, k), kw)
+
+    # --- --deep, Planetary Computer (or zarr-python 2): open through xarray ---
+    open_url = _XARRAY_OPENERS.get(entry.access_protocol)
+    if open_url is None:
+        return None
+    return _open_dataset(entry, lambda k: open_url(entry.store_url, **k), kw)
+
+
+def _open_kerchunk_json(entry, kw, deep):
+    if _zarr_only(entry, deep):
+        store = _reference_store(entry.store_url, **entry.storage_options)
+        return zarr_sync(_open_zarr_arrays_async(store, zarr_format=2))
+    return _open_reference_json(entry.store_url, **entry.storage_options)
+
+
+def _open_kerchunk_parquet(entry, kw, deep):
+    return _open_reference_parquet(entry.store_url, **entry.storage_options)
+
+
+def _open_netcdf_source(entry, kw, deep):
+    if entry.access_protocol != "s3-netcdf":
+        return None
+    return _open_netcdf_s3(entry.store_url)
+
+
+# zarr_version -> opener(entry, kwargs, deep) returning an xr.Dataset, a
+# {name: array} dict from the zarr-native path, or None if unsupported
+_PROBE_DISPATCH = {
+    "V2": _open_zarr_store,
+    "V3": _open_zarr_store,
+    "kerchunk-json": _open_kerchunk_json,
+    "kerchunk-parquet": _open_kerchunk_parquet,
+    "netcdf-source": _open_netcdf_source,
+}
+
+
+def probe_xarray(entry: ZarrEntry, deep: bool = False) -> ZarrEntry:
+    """Try to open the Zarr store and extract basic metadata.
+
+    Plain V2/V3 stores are read with zarr's async API (metadata only) unless
+    deep is set; kerchunk references, NetCDF and Planetary Computer entries
+    go through xarray.
+    """
+    t0 = time.time()
+    if entry.access_protocol == "auth-required":
+        entry.status = "skip-auth"
+        entry.elapsed_s = round(time.time() - t0, 2)
+        return entry
+
+    pool = None
+    try:
+        opener = _PROBE_DISPATCH.get(entry.zarr_version)
+        if opener is None:
+            opened = None
+        elif entry.open_timeout:
+            # give up on the open after open_timeout; the thread finishes on its own
+            pool = concurrent.futures.ThreadPoolExecutor(1)
+            opened = pool.submit(opener, entry, _resolved_kwargs(entry), deep).result(
+                timeout=entry.open_timeout)
         else:
+            opened = opener(entry, _resolved_kwargs(entry), deep)
+        if opened is None:
             entry.status = "skip-unknown"
-            entry.error = f"Unknown access_protocol: {entry.access_protocol}"
+            entry.error = (f"Unknown access_protocol/zarr_version: "
+                           f"{entry.access_protocol}/{entry.zarr_version}")
             entry.elapsed_s = round(time.time() - t0, 2)
             return entry
 
         # --- Extract metadata ---
-        entry.dims_found = {str(k): int(v) for k, v in ds.sizes.items()}
+        if isinstance(opened, dict):
+            entry.dims_found = _dims_from_arrays(opened)
+        else:
+            entry.dims_found = {str(k): int(v) for k, v in opened.sizes.items()}
         entry.status = "ok"
-        if entry.variable_hint and entry.variable_hint in ds:
-            shape = ds[entry.variable_hint].shape
+        if entry.variable_hint and entry.variable_hint in opened:
+            shape = tuple(opened[entry.variable_hint].shape)
             entry.notes += f" Variable '{entry.variable_hint}' shape={shape}."
-        ds.close()
+        if not isinstance(opened, dict):
+            opened.close()
 
+    except concurrent.futures.TimeoutError:
+        entry.status = "timeout"
+        entry.error = f"TimeoutError: open took longer than {entry.open_timeout}s"
     except ImportError as exc:
         entry.status = "skip-deps"
         entry.error = f"{type(exc).__name__}: {exc}"
     except Exception as exc:
         entry.status = "error"
         entry.error = f"{type(exc).__name__}: {exc}"
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False)
 
     entry.elapsed_s = round(time.time() - t0, 2)
     return entry
 
 
+# ---------------------------------------------------------------------------
+# Probe result cache
+# ---------------------------------------------------------------------------
+
+# Two independent caches, checked in this order:
+#   1. --cache PATH: whole probe results. A hit skips the probe entirely; it
+#      is trusted for --max-age seconds, then only while the store's ETag is
+#      unchanged. --refresh ignores every hit and overwrites it.
+#   2. ZARR_CATALOG_CACHE: metadata documents, consulted only when a probe
+#      actually runs. Each read is revalidated against the remote checksum,
+#      so it never serves stale metadata; --refresh doesn't bypass it,
+#      --no-cache does.
+
+# Reuse a cached result without even a HEAD if it was validated this recently
+CACHE_MAX_AGE = 300.0
+
+
+def _fingerprint(entry):
+    """ETag (or size/mtime) of the entry's metadata object, or None if unknown.
+
+    One HEAD request: .zmetadata for V2 stores, zarr.json for V3, the file
+    itself for references and NetCDF.
+    """
+    if entry.access_protocol in ("auth-required", "pc-azure"):
+        return None
+    url = entry.store_url.rstrip("/")
+    if entry.access_protocol in ZARR_STORAGE_OPTIONS:
+        url += "/zarr.json" if entry.zarr_version == "V3" else "/.zmetadata"
+    elif entry.access_protocol == "reference-parquet":
+        url += "/.zmetadata"
+    protocol = fsspec.utils.get_protocol(url)
+    try:
+        info = _get_fs(protocol, ZARR_STORAGE_OPTIONS.get(protocol)).info(url)
+    except Exception:
+        return None
+    for key in ("ETag", "etag", "md5Hash", "LastModified", "mtime"):
+        if info.get(key):
+            return f"{key}:{info[key]}"
+    return f"size:{info['size']}" if info.get("size") else None
+
+
+def load_probe_cache(path):
+    """Load the {_cache_key(entry): result} cache from PATH/catalog.pkl."""
+    try:
+        with open(os.path.join(path, "catalog.pkl"), "rb") as f:
+            return pickle.load(f)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        return {}
+
+
+def save_probe_cache(path, cache):
+    """Write cache to PATH/catalog.pkl atomically, so an interrupted run can't truncate it."""
+    os.makedirs(path, exist_ok=True)
+    target = os.path.join(path, "catalog.pkl")
+    tmp = f"{target}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            pickle.dump(cache, f)
+        os.replace(tmp, target)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _cache_key(entry):
+    """Results are keyed on what was opened, so editing an entry invalidates it."""
+    spec = entry.store_url + json.dumps([entry.open_kwargs, entry.storage_options,
+                                         entry.needs_cftime], sort_keys=True)
+    return hashlib.sha1(spec.encode()).hexdigest()
+
+
+def probe_cached(entry: ZarrEntry, cache: dict, probe=probe_xarray,
+                 max_age=CACHE_MAX_AGE, refresh=False) -> ZarrEntry:
+    """Run probe, short-circuited when the store's metadata is unchanged.
+
+    A hit younger than max_age seconds is used as is; otherwise the metadata
+    object's ETag is compared with the cached one, so an unchanged store
+    costs one HEAD instead of a full open. refresh ignores existing hits.
+    Only successful probes are cached.
+    """
+    key = _cache_key(entry)
+    hit = None if refresh else cache.get(key)
+    now = time.time()
+    etag = None
+    if hit is None or now - hit["checked"] >= max_age:
+        etag = _fingerprint(entry)
+        if hit is not None and (etag is None or etag != hit["etag"]):
+            hit = None
+    if hit is not None:
+        entry.status = hit["status"]
+        entry.elapsed_s = hit["elapsed_s"]
+        entry.dims_found = dict(hit["dims_found"])
+        entry.notes = hit["notes"] + " (cached)"
+        if etag is not None:
+            hit["checked"] = now
+        return entry
+
+    probe(entry)
+    if entry.status == "ok" and etag is not None:
+        cache[key] = dict(
+            etag=etag, checked=now, status=entry.status, elapsed_s=entry.elapsed_s,
+            dims_found=dict(entry.dims_found), notes=entry.notes,
+        )
+    return entry
+
+
+def _make_probe(cache=None, deep=False, cache_max_age=CACHE_MAX_AGE, refresh=False):
+    """The per-entry probe function for run_catalog's options."""
+    probe = functools.partial(probe_xarray, deep=True) if deep else probe_metadata_only
+    if cache is not None:
+        probe = functools.partial(probe_cached, cache=cache, probe=probe,
+                                  max_age=cache_max_age, refresh=refresh)
+    return probe
+
+
+def _write_progress(probed):
+    icon = STATUS_ICONS.get(probed.status, probed.status)
+    # a single unflushed write per line: when stdout is a pipe or file
+    # progress is block-buffered instead of costing a syscall per probe
+    sys.stdout.write(f"  [{icon:>10}] {probed.id} ({probed.elapsed_s}s)\n")
+
+
+def run_catalog(entries, max_workers=16, timeout=120.0, cache=None, deep=False,
+                cache_max_age=CACHE_MAX_AGE, refresh=False):
+    """Probe entries concurrently on a thread pool.
+
+    Opens are I/O bound (TLS + HTTP round trips), so wall time drops from the
+    sum of all probe latencies to roughly the slowest one. Progress is printed
+    as probes finish; the probed copies are returned in input order. Each
+    probe works on a copy of its entry and the entries passed in are never
+    modified, so they can be shared between threads and a probe that outlives
+    its timeout can't change what was reported. With a cache dict (see
+    load_probe_cache) unchanged stores are answered from it and fresh results
+    are added to it (see probe_cached for cache_max_age / refresh). deep
+    forces a full xarray open instead of the metadata-only probe.
+    """
+    probe = _make_probe(cache, deep, cache_max_age, refresh)
+    started = {}
+
+    def timed_probe(entry):
+        started[entry.id] = time.monotonic()
+        return probe(entry)
+
+    def record(probed):
+        results[probed.id] = probed
+        _write_progress(probed)
+
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(entries))))
+    # longest-first, so a slow store doesn't start last and set the makespan;
+    # reporting order is unaffected
+    queue = sorted(entries, key=lambda e: -e.weight)
+    futures = {executor.submit(timed_probe, replace(e)): e for e in queue}
+    pending = set(futures)
+    results = {}
+    try:
+        # report in completion order so one slow store doesn't hold back the rest;
+        # the timeout runs from when a probe starts, not from when it was queued
+        while pending:
+            done, pending = concurrent.futures.wait(
+                pending, timeout=1.0, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                entry = futures[future]
+                try:
+                    record(future.result())
+                except Exception as exc:
+                    record(replace(entry, status="error", error=f"{type(exc).__name__}: {exc}"))
+            now = time.monotonic()
+            for future in [f for f in pending if now - started.get(futures[f].id, now) > timeout]:
+                pending.discard(future)
+                record(replace(futures[future], status="timeout", elapsed_s=timeout,
+                               error=f"TimeoutError: no result after {timeout}s"))
+    finally:
+        # don't wait on probes that timed out; their threads finish on their own
+        executor.shutdown(wait=False, cancel_futures=True)
+    return [results[e.id] for e in entries]
+
+
+async def aprobe_metadata_only(entry: ZarrEntry, probe=probe_metadata_only) -> ZarrEntry:
+    """Coroutine probe: zarr's async API for plain V2/V3 stores, probe otherwise.
+
+    Zarr stores are opened on the running loop (zarr's own), so every probe
+    shares one event loop, one connection pool per filesystem and the
+    per-host semaphores. Everything else (kerchunk, NetCDF, Planetary
+    Computer) runs probe in the loop's default thread pool.
+    """
+    if entry.access_protocol not in ZARR_STORAGE_OPTIONS:
+        return await asyncio.to_thread(probe, entry)
+
+    t0 = time.time()
+    kw = entry.open_kwargs
+    store = _zarr_store(entry)
+    try:
+        try:
+            arrays = await _open_zarr_arrays_async(
+                store, path=kw.get("group"), zarr_format=kw.get("zarr_format"),
+                use_consolidated=True)
+            entry.notes += " Opened consolidated."
+        except _NO_CONSOLIDATED as exc:
+            if not _is_missing_consolidated(exc):
+                raise
+            arrays = await _open_zarr_arrays_async(
+                store, path=kw.get("group"), zarr_format=kw.get("zarr_format"),
+                use_consolidated=False)
+            entry.notes += " Opened unconsolidated (no consolidated metadata)."
+    except Exception as exc:
+        entry.status = "error"
+        entry.error = f"{type(exc).__name__}: {exc}"
+    else:
+        entry.dims_found = _dims_from_arrays(arrays)
+        entry.status = "ok"
+        if entry.variable_hint in arrays:
+            shape = tuple(arrays[entry.variable_hint].shape)
+            entry.notes += f" Variable '{entry.variable_hint}' shape={shape}."
+    entry.elapsed_s = round(time.time() - t0, 2)
+    return entry
+
+
+async def _run_catalog_async(entries, timeout, probe, native=True):
+    async def run(entry):
+        t0 = time.monotonic()
+        aprobe = (aprobe_metadata_only(replace(entry), probe) if native
+                  else asyncio.to_thread(probe, replace(entry)))
+        try:
+            probed = await asyncio.wait_for(aprobe, timeout)
+        except asyncio.TimeoutError:
+            probed = replace(entry, status="timeout", elapsed_s=timeout,
+                             error=f"TimeoutError: no result after {timeout}s")
+        except Exception as exc:
+            probed = replace(entry, status="error", elapsed_s=round(time.monotonic() - t0, 2),
+                             error=f"{type(exc).__name__}: {exc}")
+        _write_progress(probed)
+        return probed
+
+    return await asyncio.gather(*(run(e) for e in entries))
+
+
+def run_catalog_async(entries, timeout=120.0, cache=None, deep=False,
+                      cache_max_age=CACHE_MAX_AGE, refresh=False):
+    """Probe entries as coroutines gathered on zarr's event loop.
+
+    Same options and result as run_catalog. Plain Zarr stores need no thread
+    at all; with a cache or deep set every entry takes the threaded probe.
+    Falls back to run_catalog when zarr's async API is unavailable.
+    """
+    if zarr_async is None:
+        return run_catalog(entries, timeout=timeout, cache=cache, deep=deep,
+                           cache_max_age=cache_max_age, refresh=refresh)
+    probe = _make_probe(cache, deep, cache_max_age, refresh)
+    native = cache is None and not deep
+    # held for the whole run: the probes' own zarr.config.set blocks interleave
+    # on the loop, and each would otherwise restore the value on its way out
+    with zarr.config.set({"async.concurrency": PROBE_CONCURRENCY}):
+        return zarr_sync(_run_catalog_async(entries, timeout, probe, native))
+
+
+def _gdal_mdim_summary(dsn):
+    """One "name(dim=size, ...)" line per array in the root group."""
+    with gdal.config_options(GDAL_PROBE_CONFIG):
+        ds = gdal.OpenEx(dsn, gdal.OF_MULTIDIM_RASTER)
+        root = ds.GetRootGroup()
+        lines = []
+        for name in root.GetMDArrayNames() or []:
+            arr = root.OpenMDArray(name)
+            dims = ", ".join(f"{d.GetName()}={d.GetSize()}" for d in arr.GetDimensions())
+            lines.append(f"{name}({dims})")
+    return "\n".join(lines)
+
+
+# gdalmdiminfo output kept per entry, and how long each process may run
+GDAL_OUTPUT_CHARS = 2000
+GDAL_TIMEOUT = 30
+
+
+def _gdalmdiminfo_all(entries):
+    """gdalmdiminfo for every entry, all processes running at once; returns {id: output}.
+
+    One loop polls every process's stdout and keeps only the first
+    GDAL_OUTPUT_CHARS of each, killing a process once it has produced that
+    much (rather than buffering its full, possibly MB, output) or when
+    GDAL_TIMEOUT runs out.
+    """
+    config = [arg for key, value in GDAL_PROBE_CONFIG.items()
+              for arg in ("--config", key, value)]
+    procs = {}
+    try:
+        for entry in entries:
+            procs[entry.id] = subprocess.Popen(
+                ["gdalmdiminfo", *config, entry.gdal_dsn],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except FileNotFoundError:
+        for proc in procs.values():
+            proc.kill()
+        return {entry.id: "gdalmdiminfo not found" for entry in entries}
+
+    out = {id_: bytearray() for id_ in procs}
+    deadline = time.monotonic() + GDAL_TIMEOUT
+    with selectors.DefaultSelector() as sel:
+        for id_, proc in procs.items():
+            sel.register(proc.stdout, selectors.EVENT_READ, id_)
+        while sel.get_map() and (remaining := deadline - time.monotonic()) > 0:
+            for key, _ in sel.select(remaining):
+                buf = out[key.data]
+                data = os.read(key.fd, GDAL_OUTPUT_CHARS - len(buf))
+                buf += data
+                if not data or len(buf) >= GDAL_OUTPUT_CHARS:
+                    sel.unregister(key.fileobj)
+        timed_out = {key.data for key in sel.get_map().values()}
+
+    results = {}
+    for id_, proc in procs.items():
+        with proc:
+            text = out[id_].decode(errors="replace")
+            if id_ in timed_out:
+                proc.kill()
+                results[id_] = f"GDAL error: gdalmdiminfo timed out after {GDAL_TIMEOUT}s"
+            elif len(out[id_]) >= GDAL_OUTPUT_CHARS:
+                proc.kill()
+                results[id_] = text
+            elif proc.wait() != 0:
+                results[id_] = f"ERROR: {proc.stderr.read(500).decode(errors='replace')}"
+            else:
+                results[id_] = text
+    return results
+
+
 def probe_gdal(entry: ZarrEntry) -> str:
-    """Return gdalmdiminfo output for the entry's GDAL DSN, if set."""
-    import subprocess
+    """Summarise the entry's GDAL DSN as a multidim dataset, if set.
+
+    Uses the osgeo bindings when available, otherwise gdalmdiminfo output.
+    """
     if not entry.gdal_dsn:
         return ""
+    if gdal is None:
+        return _gdalmdiminfo_all([entry])[entry.id]
     try:
-        result = subprocess.run(
-            ["gdalmdiminfo", entry.gdal_dsn],
-            capture_output=True, text=True, timeout=30
-        )
-        return result.stdout[:2000] if result.returncode == 0 else f"ERROR: {result.stderr[:500]}"
-    except FileNotFoundError:
-        return "gdalmdiminfo not found"
+        return _gdal_mdim_summary(entry.gdal_dsn)[:GDAL_OUTPUT_CHARS]
     except Exception as e:
         return f"GDAL error: {e}"
 
 
+def probe_gdal_all(entries):
+    """probe_gdal for every entry with a DSN, all at once; returns {id: output}.
+
+    Each probe is network bound, so running them side by side makes the
+    --gdal pass take as long as the slowest DSN rather than the sum: the
+    gdalmdiminfo processes are started together and polled from this
+    thread, while in-process osgeo probes each get a thread.
+    """
+    with_dsn = [e for e in entries if e.gdal_dsn]
+    if not with_dsn:
+        return {}
+    if gdal is None:
+        return _gdalmdiminfo_all(with_dsn)
+    with concurrent.futures.ThreadPoolExecutor(len(with_dsn)) as pool:
+        return dict(zip((e.id for e in with_dsn), pool.map(probe_gdal, with_dsn)))
+
+
 # ---------------------------------------------------------------------------
 # Reporting
 # ---------------------------------------------------------------------------
@@ -542,6 +1542,7 @@ def probe_gdal(entry: ZarrEntry) -> str:
 STATUS_ICONS = {
     "ok": "OK",
     "error": "FAIL",
+    "timeout": "TIMEOUT",
     "skip-auth": "SKIP(auth)",
     "skip-deps": "SKIP(deps)",
     "skip-unknown": "SKIP(?)",
@@ -551,44 +1552,79 @@ STATUS_ICONS = {
 
 def print_report(catalog):
     ok = sum(1 for e in catalog if e.status == "ok")
-    err = sum(1 for e in catalog if e.status == "error")
+    err = sum(1 for e in catalog if e.status in ("error", "timeout"))
     skip = sum(1 for e in catalog if e.status.startswith("skip"))
     untested = sum(1 for e in catalog if e.status == "untested")
     total = len(catalog)
-    print(f"\n{'='*72}")
-    print(f"  Zarr Catalog Probe Report")
-    print(f"  {ok} ok / {err} error / {skip} skipped / {untested} untested (of {total})")
-    print(f"{'='*72}\n")
+    rule = "=" * 72
+    sys.stdout.write(
+        f"\n{rule}\n  Zarr Catalog Probe Report\n"
+        f"  {ok} ok / {err} error / {skip} skipped / {untested} untested (of {total})\n"
+        f"{rule}\n\n"
+    )
+    pad = " " * 13
     for e in catalog:
+        # one write per entry rather than a print (and lock/flush) per line
         icon = STATUS_ICONS.get(e.status, e.status)
-        print(f"  [{icon:>10}] {e.id}")
-        print(f"             {e.name}")
-        print(f"             {e.provider} | {e.zarr_version} | {e.access_protocol}")
-        print(f"             {e.store_url}")
+        text = (
+            f"  [{icon:>10}] {e.id}\n"
+            f"{pad}{e.name}\n"
+            f"{pad}{e.provider} | {e.zarr_version} | {e.access_protocol}\n"
+            f"{pad}{e.store_url}\n"
+        )
         if e.status == "ok":
-            print(f"             dims={e.dims_found}  ({e.elapsed_s}s)")
-        elif e.status == "error":
-            print(f"             {e.error}")
-            print(f"             ({e.elapsed_s}s)")
+            text += f"{pad}dims={e.dims_found}  ({e.elapsed_s}s)\n"
+        elif e.status in ("error", "timeout"):
+            text += f"{pad}{e.error}\n{pad}({e.elapsed_s}s)\n"
         if e.notes.strip():
-            print(f"             note: {e.notes.strip()}")
-        print()
+            text += f"{pad}note: {e.notes.strip()}\n"
+        sys.stdout.write(text + "\n")
+
+
+_MD_HEADER = (
+    "| Status | ID | Provider | Protocol | Time |\n"
+    "|--------|----|----------|----------|------|\n"
+)
+_MD_ROW = "| {icon} | `{id}` | {provider} | {access_protocol} | {time} |\n"
+_MD_ICONS = {"ok": "✅", "error": "❌", "timeout": "⏱️"}
+
+
+def _markdown_row(e):
+    return _MD_ROW.format_map(dict(
+        icon=_MD_ICONS.get(e.status, "⏭️"), id=e.id, provider=e.provider,
+        access_protocol=e.access_protocol, time=f"{e.elapsed_s}s" if e.elapsed_s else "-",
+    ))
 
 
 def emit_markdown(catalog):
-    """Print a Markdown summary table."""
-    print("| Status | ID | Provider | Protocol | Time |")
-    print("|--------|----|----------|----------|------|")
-    for e in catalog:
-        icon = {"ok": "✅", "error": "❌"}.get(e.status, "⏭️")
-        t = f"{e.elapsed_s}s" if e.elapsed_s else "-"
-        print(f"| {icon} | `{e.id}` | {e.provider} | {e.access_protocol} | {t} |")
+    """Print a Markdown summary table per zarr_version, sections sorted by version."""
+    by_version = attrgetter("zarr_version")
+    for version, group in groupby(sorted(catalog, key=by_version), key=by_version):
+        sys.stdout.write(f"\n### {version}\n\n{_MD_HEADER}")
+        sys.stdout.writelines(map(_markdown_row, group))
+
+
+def _iter_json(items):
+    """JSON array text for items, one element at a time.
+
+    Same output as _dumps(list(items)), without holding the whole document
+    (or a list of asdict copies) in memory.
+    """
+    first = True
+    for item in items:
+        yield ("[\n" if first else ",\n") + textwrap.indent(_dumps(item), "  ")
+        first = False
+    yield "[]\n" if first else "\n]\n"
 
 
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 
+# Entries --skip-slow leaves out
+SLOW_IDS = frozenset({"arco-era5-single-level", "arco-era5-v3"})
+
+
 def main():
     parser = argparse.ArgumentParser(description="Probe public Zarr endpoints")
     parser.add_argument("--json", action="store_true", help="Emit JSON output")
@@ -597,34 +1633,69 @@ def main():
                         help="Skip entries known to be slow (>30s)")
     parser.add_argument("--ids", nargs="*", help="Only probe these IDs")
     parser.add_argument("--markdown", action="store_true", help="Emit Markdown table")
+    parser.add_argument("--workers", type=int, default=16,
+                        help="Number of entries probed concurrently")
+    parser.add_argument("--timeout", type=float, default=120.0,
+                        help="Seconds to wait for each probe before marking it an error")
+    parser.add_argument("--cache", metavar="PATH",
+                        help="Directory for cached probe results (reused while the store's ETag is unchanged)")
+    parser.add_argument("--max-age", type=float, default=CACHE_MAX_AGE,
+                        help="Seconds a --cache result is trusted before its ETag is rechecked")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Re-probe everything and overwrite --cache results "
+                             "(metadata still comes through ZARR_CATALOG_CACHE if set)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Don't use the on-disk metadata cache (ZARR_CATALOG_CACHE)")
+    parser.add_argument("--spec", action="store_true",
+                        help="Emit the catalog spec as JSON without probing")
+    parser.add_argument("--deep", action="store_true",
+                        help="Open every store with xarray instead of parsing consolidated metadata")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Probe as coroutines on one event loop instead of a thread pool")
     args = parser.parse_args()
-
-    slow_ids = {"arco-era5-single-level", "arco-era5-v3"}
-    entries_to_probe = CATALOG
-    if args.ids:
-        entries_to_probe = [e for e in CATALOG if e.id in args.ids]
-    if args.skip_slow:
-        entries_to_probe = [e for e in entries_to_probe if e.id not in slow_ids]
-
-    for entry in entries_to_probe:
-        print(f"  Probing {entry.id} ...", end=" ", flush=True)
-        probe_xarray(entry)
-        print(f"{entry.status} ({entry.elapsed_s}s)")
+    if args.no_cache:
+        global METADATA_CACHE_DIR
+        METADATA_CACHE_DIR = None
+
+    if args.spec:
+        sys.stdout.writelines(_iter_json(CATALOG_SPEC))
+        return
+
+    warm = threading.Thread(target=_warm_filesystems, daemon=True)
+    warm.start()
+
+    catalog = list(iter_entries())
+    ids = frozenset(args.ids) if args.ids else None
+    skip = SLOW_IDS if args.skip_slow else frozenset()
+    entries_to_probe = [e for e in catalog
+                        if (ids is None or e.id in ids) and e.id not in skip]
+
+    cache = load_probe_cache(args.cache) if args.cache else None
+    warm.join()
+    if args.use_async:
+        run = run_catalog_async
+    else:
+        run = functools.partial(run_catalog, max_workers=args.workers)
+    probed = {e.id: e for e in run(entries_to_probe, timeout=args.timeout, cache=cache,
+                                   deep=args.deep, cache_max_age=args.max_age,
+                                   refresh=args.refresh)}
+    results = [probed.get(e.id, e) for e in catalog]
+    if args.cache:
+        save_probe_cache(args.cache, cache)
 
     if args.json:
-        print(json.dumps([asdict(e) for e in CATALOG], indent=2))
+        sys.stdout.writelines(_iter_json(results))
     elif args.markdown:
-        emit_markdown(CATALOG)
+        emit_markdown(results)
     else:
-        print_report(CATALOG)
+        print_report(results)
 
     if args.gdal:
         print("\n--- GDAL Multidim Probes ---\n")
-        for e in CATALOG:
+        outputs = probe_gdal_all(results)
+        for e in results:
             if e.gdal_dsn:
-                print(f"  {e.id}: {e.gdal_dsn}")
-                out = probe_gdal(e)
-                print(f"  {out[:500]}\n")
+                sys.stdout.write(f"  {e.id}: {e.gdal_dsn}\n  {outputs[e.id][:500]}\n\n")
 
 
 if __name__ == "__main__":
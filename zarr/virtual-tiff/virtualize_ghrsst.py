@@ -5,13 +5,23 @@ Includes monkeypatch for virtual-tiff imagecodecs ZSTD recursive config bug.
 
 Usage:
     python virtualize_ghrsst.py
-    python virtualize_ghrsst.py -w 16
+    python virtualize_ghrsst.py -w 128
+    python virtualize_ghrsst.py --concat   # build the combined dataset in memory first
+    python virtualize_ghrsst.py --executor process   # parse headers on every core
+    python virtualize_ghrsst.py --cache-dir vcache   # reuse per-file results on reruns
 """
 
 import argparse
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import pickle
+import sys
 import warnings
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 warnings.filterwarnings(
     "ignore",
@@ -37,22 +47,19 @@ import numpy as _np
 
 _orig_zarr_codec_config_to_v2 = _vz_codecs.zarr_codec_config_to_v2
 
+# Codecs that are Zarr-internal, not numcodecs filters
+_SKIP_CODEC_NAMES = frozenset({"HorizontalDeltaCodec", "BytesCodec", "bytes"})
+_SKIP_CODEC_IDS = frozenset({"bytes"})
+
 def _unwrap_and_convert(codec_config):
     conf = codec_config
-    # For imagecodecs wrappers, drill to the leaf v2 dict
-    if isinstance(conf, dict) and conf.get("name", "").startswith("imagecodecs_"):
-        while isinstance(conf, dict) and "configuration" in conf:
-            inner = conf["configuration"]
-            if isinstance(inner, dict) and "configuration" in inner:
-                conf = inner
-            else:
-                return inner
-        return conf
-    # Skip codecs that are Zarr-internal, not numcodecs filters
-    skip_names = {"HorizontalDeltaCodec", "BytesCodec", "bytes"}
-    skip_ids = {"bytes"}
     if isinstance(conf, dict):
-        if conf.get("name") in skip_names or conf.get("id") in skip_ids:
+        # For imagecodecs wrappers, drill to the leaf v2 dict
+        if conf.get("name", "").startswith("imagecodecs_"):
+            while isinstance(conf, dict) and "configuration" in conf:
+                conf = conf["configuration"]
+            return conf
+        if conf.get("name") in _SKIP_CODEC_NAMES or conf.get("id") in _SKIP_CODEC_IDS:
             return None
     try:
         return _orig_zarr_codec_config_to_v2(conf)
@@ -69,19 +76,35 @@ _vz_utils.zarr_codec_config_to_v2 = _unwrap_and_convert
 import virtualizarr.writers.kerchunk as _vz_kerchunk
 _orig_convert_v3_to_v2 = _vz_utils.convert_v3_to_v2_metadata
 
+from zarr.core.metadata.v2 import ArrayV2Metadata
+
+# Every GHRSST file has the same array metadata, so convert it once: keyed on
+# shape, dtype, chunks, fill value and the codec configs (as JSON, since the
+# codec objects themselves aren't hashable). ArrayV2Metadata is immutable, so
+# the cached instance can be shared.
+_V2_METADATA_CACHE = {}
+
 def _patched_convert(metadata):
-    from virtualizarr.codecs import get_codec_config
-    from zarr.core.metadata.v2 import ArrayV2Metadata
     zarray = metadata
+    confs = [_vz_codecs.get_codec_config(codec) for codec in zarray.codecs]
+    key = (
+        tuple(zarray.shape),
+        zarray.data_type,
+        tuple(zarray.chunk_grid.chunk_shape),
+        int(zarray.fill_value),
+        json.dumps(confs, sort_keys=True, default=repr),
+    )
+    cached = _V2_METADATA_CACHE.get(key)
+    if cached is not None:
+        return cached
     v2_codecs = []
-    for codec in zarray.codecs:
-        conf = get_codec_config(codec)
+    for conf in confs:
         v2 = _vz_utils.zarr_codec_config_to_v2(conf)
         if v2 is not None:
             v2_codecs.append(v2)
     compressor = v2_codecs[-1] if v2_codecs else None
     filters = v2_codecs[:-1] if len(v2_codecs) > 1 else None
-    return ArrayV2Metadata(
+    cached = _V2_METADATA_CACHE[key] = ArrayV2Metadata(
         shape=zarray.shape,
         dtype=zarray.data_type,
         chunks=zarray.chunk_grid.chunk_shape,
@@ -90,22 +113,50 @@ def _patched_convert(metadata):
         compressor=compressor,
         filters=filters,
     )
+    return cached
 
 _vz_utils.convert_v3_to_v2_metadata = _patched_convert
 _vz_kerchunk.convert_v3_to_v2_metadata = _patched_convert
 
+# ---------------------------------------------------------------------------
+# Monkeypatch: fetch each TIFF header with a single range request.
+#
+# virtual-tiff opens files with async-tiff's default 32 KiB prefetch. A MUR
+# COG's TileOffsets/TileByteCounts arrays (~2500 tiles each) run past that,
+# so every file paid further round trips while its tags were read. Prefetch
+# enough that the whole IFD comes back in the first GET.
+# ---------------------------------------------------------------------------
+
+import virtual_tiff.parser as _vt_parser
+from async_tiff import TIFF as _TIFF
+
+HEADER_PREFETCH = 64 * 1024
+
+async def _open_tiff_prefetched(*, path, store):
+    return await _TIFF.open(path, store=store, prefetch=HEADER_PREFETCH)
+
+_vt_parser._open_tiff = _open_tiff_prefetched
+
 # ---------------------------------------------------------------------------
 # Now safe to import the rest
 # ---------------------------------------------------------------------------
 
+import fsspec
 import numpy as np
 import pandas as pd
 import xarray as xr
+from fsspec.implementations.reference import LazyReferenceMapper
 from obstore.store import from_url
 from virtualizarr import open_virtual_dataset
 from virtualizarr.registry import ObjectStoreRegistry
+from virtualizarr.writers.kerchunk import dataset_to_kerchunk_refs
 from virtual_tiff import VirtualTIFF
 
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
@@ -115,64 +166,236 @@ BASE_PATH = "ausantarctic/ghrsst-mur-v2"
 START_DATE = "2002-06-01"
 END_DATE = "2026-02-14"
 OUTPUT_PATH = "ghrsst_mur_june2002.parquet"
+RECORD_SIZE = 100_000   # refs per parquet file (to_kerchunk's default)
 
 
-def ghrsst_url(date):
-    fname = (
-        f"{date.strftime('%Y%m%d')}090000-JPL-L4_GHRSST-SSTfnd-MUR-GLOB"
-        f"-v02.0-fv04.1_analysed_sst.tif"
+def ghrsst_urls(dates):
+    """URLs for a DatetimeIndex of days, formatted in one strftime pass."""
+    url_format = (
+        f"{BUCKET_URL}{BASE_PATH}/".replace("%", "%%") +
+        "%Y/%m/%d/%Y%m%d090000-JPL-L4_GHRSST-SSTfnd-MUR-GLOB"
+        "-v02.0-fv04.1_analysed_sst.tif"
     )
-    return (
-        f"{BUCKET_URL}{BASE_PATH}/"
-        f"{date.year:04d}/{date.month:02d}/{date.day:02d}/{fname}"
-    )
-
+    return dates.strftime(url_format).tolist()
+
+
+def virtualize_one(url, date, parser, registry, cache_dir=None):
+    """Virtual dataset for one file; reused from cache_dir if its ETag is unchanged."""
+    if cache_dir:
+        store, path = registry.resolve(url)
+        etag = store.head(path)["e_tag"]
+        cache_file = os.path.join(cache_dir, hashlib.sha1(url.encode()).hexdigest() + ".pkl")
+        try:
+            with open(cache_file, "rb") as f:
+                cached_etag, vds = pickle.load(f)
+            if etag is not None and cached_etag == etag:
+                return vds
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            pass
 
-def virtualize_one(url, date, parser, registry):
     vds = open_virtual_dataset(url=url, parser=parser, registry=registry)
     vds = vds.rename({"0": "analysed_sst"})
     vds = vds.expand_dims(time=[np.datetime64(date)])
+
+    if cache_dir and etag is not None:
+        # write then rename, so a concurrent or interrupted run never sees half a file
+        tmp = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump((etag, vds), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_file)
     return vds
 
 
+class ParquetRefWriter:
+    """Kerchunk parquet refs written file by file as virtualization finishes.
+
+    The time axis covers every date from the start, so each file's chunk refs
+    go straight to their final rows and a parquet record is written as soon
+    as it fills; nothing is concatenated or held in memory. A file that fails
+    leaves its time step without refs, i.e. it reads as the fill value.
+    """
+
+    def __init__(self, path, dates):
+        fs, root = fsspec.core.url_to_fs(path)
+        self.out = LazyReferenceMapper.create(root=root, fs=fs, record_size=RECORD_SIZE,
+                                              categorical_threshold=10)
+        self.n_times = len(dates)
+        time_refs = dataset_to_kerchunk_refs(xr.Dataset(coords={"time": dates.values}))
+        for key, value in sorted(time_refs["refs"].items()):
+            self.out[key] = value
+        self.written_meta = set()   # variables (and "" for the root) already written
+
+    def add(self, i, vds):
+        """Store the refs of vds (one time step) at time index i."""
+        refs = dataset_to_kerchunk_refs(vds.drop_vars("time"))["refs"]
+        for key in sorted(refs):
+            name, _, chunk = key.rpartition("/")
+            if not name:
+                # root .zgroup is already written; the files share their
+                # global attributes, so keep the first set that arrives
+                if chunk == ".zattrs" and "" not in self.written_meta:
+                    self.out[key] = refs[key]
+                    self.written_meta.add("")
+                continue
+            if chunk == ".zarray":
+                if name not in self.written_meta:
+                    zarray = json.loads(refs[key])
+                    zarray["shape"][0] = self.n_times
+                    self.out[key] = json.dumps(zarray)
+                    self.written_meta.add(name)
+            elif chunk.startswith(".z"):
+                self.out[key] = refs[key]
+            else:
+                self.out[f"{name}/{i}.{chunk.split('.', 1)[1]}"] = refs[key]
+
+    def close(self):
+        self.out.flush()
+
+
+def make_registry():
+    store = from_url(BUCKET_URL, region="us-west-2", skip_signature=True)
+    return ObjectStoreRegistry({BUCKET_URL: store})
+
+
+# Per-process parser and registry for --executor process, set by _init_worker
+_worker = {}
+
+
+def _init_worker():
+    # the monkeypatches above are already in place: the module was imported
+    # (or forked) before this runs
+    _worker["parser"] = VirtualTIFF(ifd=0)
+    _worker["registry"] = make_registry()
+
+
+def _virtualize_in_worker(url, date, cache_dir=None):
+    return virtualize_one(url, date, _worker["parser"], _worker["registry"], cache_dir)
+
+
+class _Progress:
+    """Minimal stand-in for tqdm: one status line, redrawn at most once a second."""
+
+    def __init__(self, total):
+        self.total, self.n, self.last = total, 0, 0.0
+
+    def update(self, n=1):
+        self.n += n
+        now = time.perf_counter()
+        if now - self.last >= 1.0 or self.n == self.total:
+            self.last = now
+            sys.stdout.write(f"\r  {self.n}/{self.total} files")
+            sys.stdout.flush()
+
+    def write(self, msg):
+        sys.stdout.write(f"\r{msg}\n")
+
+    def close(self):
+        sys.stdout.write("\n")
+
+
+async def virtualize_all(urls, dates, parser, registry, workers, on_result,
+                         executor="thread", cache_dir=None):
+    """Virtualize every file, at most `workers` at a time.
+
+    open_virtual_dataset is synchronous, so this only gathers
+    run_in_executor calls: the loop schedules the files and collects results,
+    and the reads themselves happen in the pool. With processes each worker
+    builds its own parser and registry, and TIFF header parsing isn't
+    serialized on the GIL.
+    on_result(i, vds) is called on the loop thread for each file that
+    succeeds; returns how many did. Progress goes to a tqdm bar when tqdm is
+    installed; only failures get a line of their own.
+    """
+    loop = asyncio.get_running_loop()
+    if executor == "process":
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        task = functools.partial(_virtualize_in_worker, cache_dir=cache_dir)
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers)
+        task = functools.partial(virtualize_one, parser=parser, registry=registry,
+                                 cache_dir=cache_dir)
+
+    pbar = tqdm(total=len(urls), unit="file") if tqdm else _Progress(len(urls))
+
+    async def one(i, url, date):
+        try:
+            vds = await loop.run_in_executor(pool, task, url, date)
+        except Exception as e:
+            pbar.write(f"  {date.date()} FAILED: {e}")
+            return False
+        else:
+            on_result(i, vds)
+            return True
+        finally:
+            pbar.update(1)
+
+    with pool:
+        done = await asyncio.gather(*(one(i, url, date)
+                                      for i, (url, date) in enumerate(zip(urls, dates))))
+    pbar.close()
+    return sum(done)
+
+
 def main():
     ap = argparse.ArgumentParser(description="Virtualize GHRSST MUR COGs")
-    ap.add_argument("-w", "--workers", type=int, default=8)
+    ap.add_argument("-w", "--workers", type=int, default=None,
+                    help="Files virtualized concurrently (default 8 threads, "
+                         "or one process per core)")
+    ap.add_argument("--executor", choices=("thread", "process"), default="thread",
+                    help="Run virtualization in threads (I/O bound) or processes "
+                         "(CPU-bound header parsing)")
+    ap.add_argument("--concat", action="store_true",
+                    help="Concatenate all files into one dataset in memory before writing "
+                         "(default streams refs to parquet as each file finishes)")
+    ap.add_argument("--cache-dir", default=None,
+                    help="Keep each file's virtual dataset here, keyed by URL and checked "
+                         "against its ETag, so reruns skip unchanged files")
     args = ap.parse_args()
+    if args.workers is None:
+        args.workers = os.cpu_count() if args.executor == "process" else 8
 
-    store = from_url(BUCKET_URL, region="us-west-2", skip_signature=True)
-    registry = ObjectStoreRegistry({BUCKET_URL: store})
+    registry = make_registry()
     parser = VirtualTIFF(ifd=0)
+    if args.cache_dir:
+        os.makedirs(args.cache_dir, exist_ok=True)
 
     dates = pd.date_range(START_DATE, END_DATE, freq="D")
-    urls = [ghrsst_url(d) for d in dates]
-    print(f"Virtualizing {len(urls)} files with {args.workers} workers...")
+    urls = ghrsst_urls(dates)
+    print(f"Virtualizing {len(urls)} files with {args.workers} {args.executor} workers...")
 
     # --- Parallel virtualization ---
     t0 = time.time()
-    results = {}
-
-    with ThreadPoolExecutor(max_workers=args.workers) as pool:
-        futures = {
-            pool.submit(virtualize_one, url, date, parser, registry): date
-            for url, date in zip(urls, dates)
-        }
-        for future in as_completed(futures):
-            date = futures[future]
-            try:
-                results[date] = future.result()
-                print(f"  {date.date()} done")
-            except Exception as e:
-                print(f"  {date.date()} FAILED: {e}")
+    if args.concat:
+        # slot per date, so results come out in date order without a sort
+        results = [None] * len(urls)
+
+        def on_result(i, vds):
+            results[i] = vds
+    else:
+        writer = ParquetRefWriter(OUTPUT_PATH, dates)
+        on_result = writer.add
+    n_done = asyncio.run(virtualize_all(urls, dates, parser, registry, args.workers,
+                                        on_result, executor=args.executor,
+                                        cache_dir=args.cache_dir))
 
     elapsed_virt = time.time() - t0
-    print(f"\nVirtualized {len(results)}/{len(urls)} files in {elapsed_virt:.1f}s "
-          f"({elapsed_virt/len(results):.2f}s per file)")
+    print(f"\nVirtualized {n_done}/{len(urls)} files in {elapsed_virt:.1f}s "
+          f"({elapsed_virt/n_done:.2f}s per file)")
+
+    if not args.concat:
+        t2 = time.time()
+        writer.close()
+        print(f"Wrote parquet refs to {OUTPUT_PATH} (final flush {time.time() - t2:.1f}s)")
+        print(f"\nTotal time: {time.time() - t0:.1f}s")
+        return
 
     # --- Combine in date order ---
     t1 = time.time()
-    ordered = [results[d] for d in sorted(results.keys())]
-    combined = xr.concat(ordered, dim="time")
+    ordered = [vds for vds in results if vds is not None]
+    # Every file has the same grid and no y/x coordinates, so skip the
+    # per-dataset alignment and equality checks xarray would otherwise run
+    combined = xr.concat(ordered, dim="time", data_vars="minimal", coords="minimal",
+                         compat="override", join="override")
     elapsed_concat = time.time() - t1
     print(f"Concatenated in {elapsed_concat:.1f}s")
     print(f"\n{combined}\n")
@@ -10,24 +10,131 @@ The second mode is what rustycogs could emit for maximum flexibility.
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import icechunk
 import zarr
 import shutil
+from zarr.core.sync import sync
 from pathlib import Path
 
 
+def _column_names(refs) -> list[str]:
+    """Column names of a DataFrame or pyarrow Table."""
+    return refs.schema.names if isinstance(refs, pa.Table) else list(refs.columns)
+
+
+def _column(refs, name: str) -> np.ndarray:
+    """One column of a DataFrame or pyarrow Table as a NumPy array.
+
+    Arrow columns without nulls come back without a copy.
+    """
+    if isinstance(refs, pa.Table):
+        return refs.column(name).to_numpy()
+    return refs[name].to_numpy()
+
+
+def _valid_rows(refs, name: str) -> np.ndarray:
+    """Positions of the rows where a column is not null.
+
+    For Arrow this reads the validity bitmap instead of inspecting each
+    value, and skips the scan entirely when the column has no nulls.
+    """
+    if isinstance(refs, pa.Table):
+        col = refs.column(name)
+        if col.null_count == 0:
+            return np.arange(len(col))
+        return np.flatnonzero(pc.is_valid(col).to_numpy(zero_copy_only=False))
+    return np.flatnonzero(refs[name].notna().to_numpy())
+
+
 def flat_to_chunk_index(flat_idx: int, n_chunks_per_dim: tuple) -> tuple:
-    """Convert flat row index to chunk tuple (row-major order)."""
-    coords = []
-    remaining = flat_idx
-    for n in reversed(n_chunks_per_dim):
-        coords.append(remaining % n)
-        remaining //= n
-    return tuple(reversed(coords))
+    """Convert flat row index to chunk tuple (row-major order).
+    
+    For many rows at once call np.unravel_index on the whole index array,
+    as iter_kerchunk_spec_batches does.
+    """
+    return tuple(int(i) for i in np.unravel_index(flat_idx, n_chunks_per_dim))
+
+
+# VirtualChunkSpecs are built and submitted this many at a time, so only one
+# batch of spec objects is alive at once however many chunks there are
+SPEC_BATCH_SIZE = 100_000
+
+
+def _rows_in(rows: np.ndarray, other: np.ndarray) -> np.ndarray:
+    """Boolean mask of the rows of an (N, ndim) int array that also occur in other."""
+    if len(rows) == 0 or len(other) == 0:
+        return np.zeros(len(rows), dtype=bool)
+    # Compare whole rows at once by viewing each as one opaque item
+    row_type = np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))
+    return np.isin(
+        np.ascontiguousarray(rows, dtype=np.int64).view(row_type).ravel(),
+        np.ascontiguousarray(other, dtype=np.int64).view(row_type).ravel(),
+    )
+
+
+def _spec_batches(chunk_idx, paths, offsets, lengths, batch_size=SPEC_BATCH_SIZE, skip=None):
+    """
+    Yield lists of VirtualChunkSpecs from parallel NumPy columns, batch_size at a time.
+    
+    Rows whose chunk index is in skip (an (M, ndim) array) are left out.
+    Always yields at least one (possibly empty) list.
+    """
+    if skip is not None and len(skip):
+        keep = ~_rows_in(chunk_idx, skip)
+        chunk_idx, paths, offsets, lengths = (
+            chunk_idx[keep], paths[keep], offsets[keep], lengths[keep])
+    for start in range(0, max(len(paths), 1), batch_size):
+        stop = start + batch_size
+        yield [
+            icechunk.VirtualChunkSpec(index=idx, location=path, offset=offset, length=length)
+            for idx, path, offset, length in zip(
+                chunk_idx[start:stop].tolist(), paths[start:stop].tolist(),
+                offsets[start:stop].tolist(), lengths[start:stop].tolist())
+        ]
+
+
+def iter_kerchunk_spec_batches(
+    refs_df: pd.DataFrame | pa.Table,
+    shape: tuple,
+    chunks: tuple,
+    batch_size: int = SPEC_BATCH_SIZE,
+    skip: np.ndarray = None,
+):
+    """
+    Yield Kerchunk-style (implicit indexing) VirtualChunkSpecs in batches.
+    
+    Args:
+        refs_df: DataFrame or pyarrow Table with columns: path, offset, size (or length)
+        shape: Array shape
+        chunks: Chunk sizes
+        batch_size: Maximum number of specs per batch
+        skip: Optional (M, ndim) array of chunk indices to leave out
+        
+    Yields:
+        Lists of VirtualChunkSpec objects
+    """
+    n_chunks_per_dim = tuple((s + c - 1) // c for s, c in zip(shape, chunks))
+    
+    # Handle column name variations
+    size_col = "size" if "size" in _column_names(refs_df) else "length"
+    
+    # Pull each column out once; rows without a path are missing chunks
+    paths = _column(refs_df, "path")
+    valid = _valid_rows(refs_df, "path")
+    offsets = _column(refs_df, "offset")[valid].astype(np.int64)
+    lengths = _column(refs_df, size_col)[valid].astype(np.int64)
+    
+    # Row position is the flat chunk index; unravel them all at once (row-major)
+    chunk_idx = np.column_stack(np.unravel_index(valid, n_chunks_per_dim))
+    
+    yield from _spec_batches(chunk_idx, paths[valid], offsets, lengths, batch_size, skip)
 
 
 def kerchunk_parquet_to_icechunk(
-    refs_df: pd.DataFrame,
+    refs_df: pd.DataFrame | pa.Table,
     shape: tuple,
     chunks: tuple,
     dtype: str,
@@ -38,7 +145,7 @@ def kerchunk_parquet_to_icechunk(
     Convert Kerchunk-style parquet (implicit indexing) to VirtualChunkSpecs.
     
     Args:
-        refs_df: DataFrame with columns: path, offset, size (or length)
+        refs_df: DataFrame or pyarrow Table with columns: path, offset, size (or length)
         shape: Array shape
         chunks: Chunk sizes
         dtype: Data type string
@@ -48,28 +155,55 @@ def kerchunk_parquet_to_icechunk(
     Returns:
         List of VirtualChunkSpec objects
     """
-    n_chunks_per_dim = tuple((s + c - 1) // c for s, c in zip(shape, chunks))
+    return [spec for batch in iter_kerchunk_spec_batches(refs_df, shape, chunks)
+            for spec in batch]
+
+
+def iter_explicit_spec_batches(
+    refs_df: pd.DataFrame | pa.Table,
+    batch_size: int = SPEC_BATCH_SIZE,
+    skip: dict = None,
+):
+    """
+    Yield explicit-index VirtualChunkSpecs in batches, one variable at a time.
     
-    # Handle column name variations
-    size_col = "size" if "size" in refs_df.columns else "length"
+    Expected columns: variable, i0, i1, ..., path, offset, length
+    
+    skip optionally maps variable name to an (M, ndim) array of chunk indices
+    to leave out.
+    
+    Yields:
+        (variable name, list of VirtualChunkSpecs); every variable yields at
+        least one batch, empty if all its chunks are missing
+    """
+    # Find index columns (i0, i1, i2, ...)
+    idx_cols = sorted([c for c in _column_names(refs_df) if c.startswith("i") and c[1:].isdigit()])
+    
+    # Variable codes in order of first appearance
+    codes, variables = pd.factorize(_column(refs_df, "variable"))
     
-    specs = []
-    for i, row in refs_df.iterrows():
-        if pd.isna(row["path"]):
-            continue  # Skip missing chunks
-            
-        chunk_idx = flat_to_chunk_index(i, n_chunks_per_dim)
-        specs.append(icechunk.VirtualChunkSpec(
-            index=chunk_idx,
-            location=row["path"],
-            offset=int(row["offset"]),
-            length=int(row[size_col]),
-        ))
+    # Drop missing chunks once, then group rows by variable with a stable sort
+    # so each variable's rows are one contiguous slice in their original order
+    paths = _column(refs_df, "path")
+    valid = _valid_rows(refs_df, "path")
+    order = valid[np.argsort(codes[valid], kind="stable")]
+    sorted_codes = codes[order]
+    bounds = np.searchsorted(sorted_codes, np.arange(len(variables) + 1))
     
-    return specs
+    chunk_idx = np.column_stack([_column(refs_df, c)[order] for c in idx_cols]).astype(np.int64)
+    locations = paths[order]
+    offsets = _column(refs_df, "offset")[order].astype(np.int64)
+    lengths = _column(refs_df, "length")[order].astype(np.int64)
+    
+    for code, var in enumerate(variables):
+        lo, hi = bounds[code], bounds[code + 1]
+        for batch in _spec_batches(chunk_idx[lo:hi], locations[lo:hi],
+                                   offsets[lo:hi], lengths[lo:hi], batch_size,
+                                   (skip or {}).get(var)):
+            yield var, batch
 
 
-def explicit_parquet_to_icechunk(refs_df: pd.DataFrame) -> dict[str, list]:
+def explicit_parquet_to_icechunk(refs_df: pd.DataFrame | pa.Table) -> dict[str, list]:
     """
     Convert explicit-index parquet to VirtualChunkSpecs per variable.
     
@@ -79,37 +213,49 @@ def explicit_parquet_to_icechunk(refs_df: pd.DataFrame) -> dict[str, list]:
         Dict mapping variable name to list of VirtualChunkSpecs
     """
     result = {}
-    
-    # Find index columns (i0, i1, i2, ...)
-    idx_cols = sorted([c for c in refs_df.columns if c.startswith("i") and c[1:].isdigit()])
-    
-    for var in refs_df["variable"].unique():
-        var_df = refs_df[refs_df["variable"] == var]
-        specs = []
-        
-        for _, row in var_df.iterrows():
-            if pd.isna(row["path"]):
-                continue
-                
-            chunk_idx = tuple(int(row[c]) for c in idx_cols)
-            specs.append(icechunk.VirtualChunkSpec(
-                index=chunk_idx,
-                location=row["path"],
-                offset=int(row["offset"]),
-                length=int(row["length"]),
-            ))
-        
-        result[var] = specs
-    
+    for var, batch in iter_explicit_spec_batches(refs_df):
+        result.setdefault(var, []).extend(batch)
     return result
 
 
+def write_refs_parquet(refs_df: pd.DataFrame, parquet_path: str) -> None:
+    """
+    Write a flat refs DataFrame (either format) to parquet.
+    
+    The path and variable columns repeat the same few strings for every
+    chunk, so they are dictionary encoded; Zstd keeps the file small and
+    quick to scan, and large row groups let pyarrow decode them in parallel
+    on read.
+    """
+    dictionary_cols = [c for c in ("path", "variable") if c in refs_df.columns]
+    refs_df.to_parquet(
+        parquet_path,
+        engine="pyarrow",
+        compression="zstd",
+        compression_level=3,
+        use_dictionary=dictionary_cols,
+        row_group_size=1_000_000,
+    )
+
+
+async def _list_keys(store, prefix: str) -> list[str]:
+    return [key async for key in store.list_prefix(prefix)]
+
+
+def _existing_chunk_indices(ic_store, name: str, ndim: int) -> np.ndarray:
+    """(M, ndim) array of the chunk indices already written for array `name`."""
+    keys = [k for k in sync(_list_keys(ic_store, name)) if k.startswith(f"{name}/c/")]
+    idx = [k[len(name) + 3:].split("/") for k in keys]
+    return np.array(idx, dtype=np.int64).reshape(len(idx), ndim)
+
+
 def create_icechunk_from_flat_parquet(
     parquet_path: str,
     metadata: dict,
     output_path: str,
     url_prefix: str,
     coords: dict = None,
+    mode: str = "overwrite",
 ) -> str:
     """
     Create Icechunk store from flat parquet refs.
@@ -124,19 +270,37 @@ def create_icechunk_from_flat_parquet(
         output_path: Where to create Icechunk store
         url_prefix: URL prefix for virtual chunk container (e.g., "s3://bucket/")
         coords: Optional dict of coordinate arrays {"time": [...], "lat": [...], ...}
+        mode: "overwrite" replaces any existing store; "append" commits onto
+            the existing repo, creating only missing arrays, growing existing
+            ones to the metadata shape, and submitting refs only for chunks
+            not already present (existing refs are kept, not compared). The
+            existing chunk keys are listed once per array, so a rerun costs
+            a manifest scan but writes only new chunks; if nothing is new,
+            no commit is made and the current snapshot ID is returned
         
     Returns:
         Snapshot ID
     """
-    # Read parquet
-    df = pd.read_parquet(parquet_path)
+    if mode not in ("overwrite", "append"):
+        raise ValueError(f"mode must be 'overwrite' or 'append', got {mode!r}")
+    append = mode == "append" and Path(output_path).exists()
+    
+    # Determine format (implicit vs explicit) from the schema alone
+    names = pq.read_schema(parquet_path).names
+    has_variable_col = "variable" in names
+    has_index_cols = any(c.startswith("i") and c[1:].isdigit() for c in names)
     
-    # Determine format (implicit vs explicit)
-    has_variable_col = "variable" in df.columns
-    has_index_cols = any(c.startswith("i") and c[1:].isdigit() for c in df.columns)
+    # Read only the ref columns, straight into Arrow (no pandas blocks)
+    if has_variable_col and has_index_cols:
+        columns = ["variable", "path", "offset", "length"]
+        columns += [c for c in names if c.startswith("i") and c[1:].isdigit()]
+    else:
+        columns = ["path", "offset", "size" if "size" in names else "length"]
+    refs = pq.read_table(parquet_path, columns=columns, use_threads=True)
     
     # Setup Icechunk
-    shutil.rmtree(output_path, ignore_errors=True)
+    if not append:
+        shutil.rmtree(output_path, ignore_errors=True)
     storage = icechunk.local_filesystem_storage(output_path)
     config = icechunk.RepositoryConfig.default()
     
@@ -153,33 +317,59 @@ def create_icechunk_from_flat_parquet(
         store=store,
     ))
     
-    repo = icechunk.Repository.create(storage=storage, config=config)
+    if append:
+        repo = icechunk.Repository.open(storage=storage, config=config)
+    else:
+        repo = icechunk.Repository.create(storage=storage, config=config)
     session = repo.writable_session("main")
     ic_store = session.store
     
     # Create zarr structure
-    root = zarr.open_group(ic_store, mode="w", zarr_format=3)
+    root = zarr.open_group(ic_store, mode="a" if append else "w", zarr_format=3)
+    
+    # Chunks already written per existing array, left out of the new refs
+    present = {}
+    if append:
+        for var, meta in metadata.items():
+            if var in root:
+                present[var] = _existing_chunk_indices(ic_store, var, len(meta["shape"]))
+    
+    def ensure_array(name, meta):
+        # Create the array, or in append mode grow the existing one
+        if name in root:
+            arr = root[name]
+            if arr.shape != tuple(meta["shape"]):
+                arr.resize(meta["shape"])
+            return
+        root.create_array(
+            name,
+            shape=meta["shape"],
+            chunks=meta["chunks"],
+            dtype=meta["dtype"],
+            dimension_names=meta["dims"],
+        )
     
-    # Create coordinates if provided
+    # Create (or rewrite) coordinates if provided
     if coords:
         for name, values in coords.items():
             arr = np.asarray(values)
-            root.create_array(name, data=arr, dimension_names=[name])
+            if name in root:
+                if root[name].shape != arr.shape or not np.array_equal(root[name][...], arr):
+                    root[name].resize(arr.shape)
+                    root[name][...] = arr
+            else:
+                root.create_array(name, data=arr, dimension_names=[name])
     
     # Process refs
     if has_variable_col and has_index_cols:
-        # Explicit format
-        var_specs = explicit_parquet_to_icechunk(df)
-        for var, specs in var_specs.items():
-            meta = metadata[var]
-            root.create_array(
-                var,
-                shape=meta["shape"],
-                chunks=meta["chunks"],
-                dtype=meta["dtype"],
-                dimension_names=meta["dims"],
-            )
-            ic_store.set_virtual_refs(var, specs, validate_containers=False)
+        # Explicit format; each array is created before its first batch
+        created = set()
+        for var, specs in iter_explicit_spec_batches(refs, skip=present):
+            if var not in created:
+                ensure_array(var, metadata[var])
+                created.add(var)
+            if specs:
+                ic_store.set_virtual_refs(var, specs, validate_containers=False)
     else:
         # Implicit format (single variable)
         if len(metadata) != 1:
@@ -187,25 +377,17 @@ def create_icechunk_from_flat_parquet(
         var = list(metadata.keys())[0]
         meta = metadata[var]
         
-        specs = kerchunk_parquet_to_icechunk(
-            df, 
-            tuple(meta["shape"]),
-            tuple(meta["chunks"]),
-            meta["dtype"],
-            meta["dims"],
-            var,
-        )
-        
-        root.create_array(
-            var,
-            shape=meta["shape"],
-            chunks=meta["chunks"],
-            dtype=meta["dtype"],
-            dimension_names=meta["dims"],
-        )
-        ic_store.set_virtual_refs(var, specs, validate_containers=False)
+        ensure_array(var, meta)
+        for specs in iter_kerchunk_spec_batches(
+            refs, tuple(meta["shape"]), tuple(meta["chunks"]), skip=present.get(var)
+        ):
+            if specs:
+                ic_store.set_virtual_refs(var, specs, validate_containers=False)
     
-    snapshot_id = session.commit("Created from flat parquet")
+    if not session.has_uncommitted_changes:
+        return session.snapshot_id
+    message = "Appended from flat parquet" if append else "Created from flat parquet"
+    snapshot_id = session.commit(message)
     return snapshot_id
 
 
@@ -260,7 +442,7 @@ if __name__ == "__main__":
     with tempfile.NamedTemporaryFile(suffix=".parquet", delete=False) as f:
         parquet_path = f.name
     
-    explicit_df.to_parquet(parquet_path)
+    write_refs_parquet(explicit_df, parquet_path)
     
     metadata = {
         "sst": {"shape": [2, 2], "chunks": [1, 1], "dtype": "float32", "dims": ["lat", "lon"]},
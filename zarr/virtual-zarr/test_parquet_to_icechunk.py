@@ -0,0 +1,285 @@
+"""
+Tests for parquet_to_icechunk.py
+
+The converters are checked against the original row-by-row implementations
+(kept below as _baseline_*), then the full parquet -> Icechunk path is run
+against a local repository.
+
+Run from this directory: python -m pytest -q
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+icechunk = pytest.importorskip("icechunk")
+pa = pytest.importorskip("pyarrow")
+zarr = pytest.importorskip("zarr")
+
+import parquet_to_icechunk as p2i
+
+
+# =============================================================================
+# Baseline (original per-row) converters
+# =============================================================================
+
+
+def _baseline_flat_to_chunk_index(flat_idx, n_chunks_per_dim):
+    coords = []
+    remaining = flat_idx
+    for n in reversed(n_chunks_per_dim):
+        coords.append(remaining % n)
+        remaining //= n
+    return tuple(reversed(coords))
+
+
+def _baseline_kerchunk(refs_df, shape, chunks):
+    n_chunks_per_dim = tuple((s + c - 1) // c for s, c in zip(shape, chunks))
+    size_col = "size" if "size" in refs_df.columns else "length"
+    specs = []
+    for i, row in refs_df.iterrows():
+        if pd.isna(row["path"]):
+            continue
+        specs.append((
+            _baseline_flat_to_chunk_index(i, n_chunks_per_dim),
+            row["path"], int(row["offset"]), int(row[size_col]),
+        ))
+    return specs
+
+
+def _baseline_explicit(refs_df):
+    idx_cols = sorted([c for c in refs_df.columns if c.startswith("i") and c[1:].isdigit()])
+    result = {}
+    for var in refs_df["variable"].unique():
+        specs = []
+        for _, row in refs_df[refs_df["variable"] == var].iterrows():
+            if pd.isna(row["path"]):
+                continue
+            specs.append((
+                tuple(int(row[c]) for c in idx_cols),
+                row["path"], int(row["offset"]), int(row["length"]),
+            ))
+        result[var] = specs
+    return result
+
+
+def _as_tuples(specs):
+    return [(tuple(s.index), s.location, s.offset, s.length) for s in specs]
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+
+@pytest.fixture
+def implicit_df():
+    # 3 x 4 chunk grid, two chunks missing
+    n = 12
+    return pd.DataFrame({
+        "path": [None if i in (2, 7) else f"s3://bucket/f{i % 3}.nc" for i in range(n)],
+        "offset": np.arange(n) * 100,
+        "size": np.full(n, 100),
+    })
+
+
+@pytest.fixture
+def explicit_df():
+    # Interleaved variables, a missing chunk, and one variable with no chunks
+    return pd.DataFrame({
+        "variable": ["sst", "anom", "sst", "anom", "sst", "ice", "sst", "anom"],
+        "i0": [0, 0, 0, 1, 1, 0, 1, 0],
+        "i1": [0, 0, 1, 0, 0, 0, 1, 1],
+        "path": ["s3://b/f.nc", "s3://b/g.nc", None, "s3://b/g.nc",
+                 "s3://b/f.nc", None, "s3://b/f.nc", "s3://b/g.nc"],
+        "offset": [100, 200, 300, 400, 500, 600, 700, 800],
+        "length": [10, 20, 30, 40, 50, 60, 70, 80],
+    })
+
+
+# =============================================================================
+# Converters
+# =============================================================================
+
+
+@pytest.mark.parametrize("n_chunks", [(5,), (3, 4), (2, 3, 4)])
+def test_flat_to_chunk_index_matches_baseline(n_chunks):
+    for flat in range(int(np.prod(n_chunks))):
+        assert p2i.flat_to_chunk_index(flat, n_chunks) == _baseline_flat_to_chunk_index(flat, n_chunks)
+
+
+def test_kerchunk_matches_baseline(implicit_df):
+    specs = p2i.kerchunk_parquet_to_icechunk(implicit_df, (30, 40), (10, 10), "f4", ["y", "x"])
+    assert _as_tuples(specs) == _baseline_kerchunk(implicit_df, (30, 40), (10, 10))
+
+
+def test_kerchunk_length_column_and_no_nulls():
+    df = pd.DataFrame({"path": ["a", "b", "c", "d"], "offset": [1, 2, 3, 4], "length": [5, 6, 7, 8]})
+    for refs in (df, pa.Table.from_pandas(df)):
+        specs = p2i.kerchunk_parquet_to_icechunk(refs, (2, 2), (1, 1), "f4", ["y", "x"])
+        assert _as_tuples(specs) == _baseline_kerchunk(df, (2, 2), (1, 1))
+
+
+@pytest.mark.parametrize("as_table", [False, True])
+@pytest.mark.parametrize("batch_size", [1, 5, 100])
+def test_kerchunk_batches_match_baseline(implicit_df, as_table, batch_size):
+    refs = pa.Table.from_pandas(implicit_df) if as_table else implicit_df
+    batches = list(p2i.iter_kerchunk_spec_batches(refs, (30, 40), (10, 10), batch_size))
+
+    assert all(len(b) <= batch_size for b in batches)
+    got = _as_tuples(s for b in batches for s in b)
+    assert got == _baseline_kerchunk(implicit_df, (30, 40), (10, 10))
+
+
+def test_kerchunk_all_missing_yields_one_empty_batch():
+    df = pd.DataFrame({"path": [None, None], "offset": [0, 0], "size": [0, 0]})
+    assert list(p2i.iter_kerchunk_spec_batches(df, (2,), (1,))) == [[]]
+
+
+@pytest.mark.parametrize("as_table", [False, True])
+@pytest.mark.parametrize("batch_size", [1, 2, 100])
+def test_explicit_batches_match_baseline(explicit_df, as_table, batch_size):
+    refs = pa.Table.from_pandas(explicit_df) if as_table else explicit_df
+    got = {}
+    for var, batch in p2i.iter_explicit_spec_batches(refs, batch_size):
+        assert len(batch) <= batch_size
+        got.setdefault(var, []).extend(_as_tuples(batch))
+
+    expected = _baseline_explicit(explicit_df)
+    assert got == expected
+    assert list(got) == list(expected)
+
+
+def test_explicit_parquet_to_icechunk_matches_baseline(explicit_df):
+    got = {var: _as_tuples(specs) for var, specs in p2i.explicit_parquet_to_icechunk(explicit_df).items()}
+    expected = _baseline_explicit(explicit_df)
+    assert got == expected
+    assert list(got) == list(expected)  # variables in first-appearance order
+
+
+def test_arrow_table_input_matches_baseline(implicit_df, explicit_df):
+    specs = p2i.kerchunk_parquet_to_icechunk(
+        pa.Table.from_pandas(implicit_df), (30, 40), (10, 10), "f4", ["y", "x"])
+    assert _as_tuples(specs) == _baseline_kerchunk(implicit_df, (30, 40), (10, 10))
+
+    got = p2i.explicit_parquet_to_icechunk(pa.Table.from_pandas(explicit_df))
+    assert {var: _as_tuples(s) for var, s in got.items()} == _baseline_explicit(explicit_df)
+
+
+def test_skip_leaves_out_given_chunks(implicit_df, explicit_df):
+    skip = np.array([[0, 0], [2, 3]])
+    got = _as_tuples(s for b in p2i.iter_kerchunk_spec_batches(implicit_df, (30, 40), (10, 10), skip=skip)
+                     for s in b)
+    expected = [t for t in _baseline_kerchunk(implicit_df, (30, 40), (10, 10)) if t[0] not in {(0, 0), (2, 3)}]
+    assert got == expected
+
+    got = {}
+    for var, batch in p2i.iter_explicit_spec_batches(explicit_df, skip={"sst": np.array([[1, 1]])}):
+        got.setdefault(var, []).extend(_as_tuples(batch))
+    expected = _baseline_explicit(explicit_df)
+    expected["sst"] = [t for t in expected["sst"] if t[0] != (1, 1)]
+    assert got == expected
+
+
+def test_valid_rows_from_arrow_and_pandas():
+    df = pd.DataFrame({"path": ["a", None, "b", None, "c"]})
+    table = pa.Table.from_pandas(df)
+    assert p2i._valid_rows(df, "path").tolist() == [0, 2, 4]
+    assert p2i._valid_rows(table, "path").tolist() == [0, 2, 4]
+
+    no_nulls = pa.table({"path": ["a", "b"]})
+    assert p2i._valid_rows(no_nulls, "path").tolist() == [0, 1]
+
+
+# =============================================================================
+# Parquet -> Icechunk
+# =============================================================================
+
+
+METADATA = {
+    "sst": {"shape": [2, 2], "chunks": [1, 1], "dtype": "float32", "dims": ["lat", "lon"]},
+    "anom": {"shape": [2, 2], "chunks": [1, 1], "dtype": "float32", "dims": ["lat", "lon"]},
+}
+
+
+def _refs(var, rows):
+    return pd.DataFrame({
+        "variable": [var] * len(rows),
+        "i0": [r[0] for r in rows],
+        "i1": [r[1] for r in rows],
+        "path": ["s3://bucket/f.nc"] * len(rows),
+        "offset": [100 * (k + 1) for k in range(len(rows))],
+        "length": [100] * len(rows),
+    })
+
+
+def _open(output_path):
+    repo = icechunk.Repository.open(storage=icechunk.local_filesystem_storage(output_path))
+    session = repo.readonly_session("main")
+    return repo, session, zarr.open_group(session.store, mode="r")
+
+
+def test_create_icechunk_from_flat_parquet(tmp_path):
+    grid = [(0, 0), (0, 1), (1, 0), (1, 1)]
+    df = pd.concat([_refs("sst", grid), _refs("anom", grid)], ignore_index=True)
+    parquet_path = str(tmp_path / "refs.parquet")
+    p2i.write_refs_parquet(df, parquet_path)
+
+    output_path = str(tmp_path / "repo")
+    p2i.create_icechunk_from_flat_parquet(
+        parquet_path, METADATA, output_path, url_prefix="s3://bucket/", coords={"lat": [-45, 45]},
+    )
+
+    repo, session, root = _open(output_path)
+    assert root["sst"].shape == (2, 2)
+    assert root["anom"].shape == (2, 2)
+    assert list(root["lat"][:]) == [-45, 45]
+    assert len(session.all_virtual_chunk_locations()) == 8
+
+
+def test_write_refs_parquet_zstd_and_dictionary(tmp_path):
+    import pyarrow.parquet as pq
+
+    parquet_path = str(tmp_path / "refs.parquet")
+    p2i.write_refs_parquet(_refs("sst", [(0, 0), (0, 1)]), parquet_path)
+
+    column = pq.ParquetFile(parquet_path).metadata.row_group(0).column
+    names = pq.ParquetFile(parquet_path).schema_arrow.names
+    path = column(names.index("path"))
+    assert path.compression == "ZSTD"
+    assert path.has_dictionary_page
+    assert not column(names.index("offset")).has_dictionary_page
+
+
+
+def test_append_writes_only_new_chunks(tmp_path):
+    meta = {"sst": dict(METADATA["sst"])}
+    output_path = str(tmp_path / "repo")
+
+    first = str(tmp_path / "first.parquet")
+    p2i.write_refs_parquet(_refs("sst", [(0, 0), (0, 1), (1, 0), (1, 1)]), first)
+    p2i.create_icechunk_from_flat_parquet(first, meta, output_path, url_prefix="s3://bucket/")
+
+    # Same four chunks (now pointing elsewhere) plus a new row of two
+    grown = _refs("sst", [(0, 0), (0, 1), (1, 0), (1, 1), (2, 0), (2, 1)])
+    grown["path"] = ["s3://bucket/other.nc"] * 4 + ["s3://bucket/g.nc"] * 2
+    second = str(tmp_path / "second.parquet")
+    p2i.write_refs_parquet(grown, second)
+    meta["sst"]["shape"] = [3, 2]
+
+    snapshot = p2i.create_icechunk_from_flat_parquet(
+        second, meta, output_path, url_prefix="s3://bucket/", mode="append")
+    repo, session, root = _open(output_path)
+    assert root["sst"].shape == (3, 2)
+    assert sorted(session.all_virtual_chunk_locations()) == ["s3://bucket/f.nc"] * 4 + ["s3://bucket/g.nc"] * 2
+    assert [s.message for s in repo.ancestry(branch="main")][0] == "Appended from flat parquet"
+
+    # Nothing new: no commit
+    again = p2i.create_icechunk_from_flat_parquet(
+        second, meta, output_path, url_prefix="s3://bucket/", mode="append")
+    assert again == snapshot
+
+
+def test_bad_mode_raises(tmp_path):
+    with pytest.raises(ValueError, match="mode"):
+        p2i.create_icechunk_from_flat_parquet("unused", METADATA, str(tmp_path), "s3://bucket/", mode="update")
@@ -0,0 +1,222 @@
+"""
+Tests for virtualizarr_icechunk.py
+
+Local-filesystem round trips: an HDF5 file is virtualized with HDFParser,
+written to a local Icechunk repo with file:// virtual refs, committed and
+read back.
+
+Run from this directory: python -m pytest -q
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+icechunk = pytest.importorskip("icechunk")
+h5py = pytest.importorskip("h5py")
+pytest.importorskip("virtualizarr")
+
+import obstore
+import zarr
+from obspec_utils.registry import ObjectStoreRegistry
+from obstore.store import LocalStore
+from virtualizarr import open_virtual_dataset
+from virtualizarr.parsers import HDFParser
+
+import virtualizarr_icechunk as vi
+
+DATA = np.arange(24, dtype="f4").reshape(2, 3, 4)
+
+
+@pytest.fixture
+def source(tmp_path):
+    """(url_prefix, registry, url) for one chunked HDF5 file under tmp_path."""
+    with h5py.File(tmp_path / "src.h5", "w") as f:
+        f.create_dataset("sst", data=DATA, chunks=(1, 3, 4))
+    url_prefix = f"file://{tmp_path}/"
+    registry = ObjectStoreRegistry({url_prefix.rstrip("/"): LocalStore(tmp_path)})
+    return url_prefix, registry, url_prefix + "src.h5"
+
+
+@pytest.fixture
+def vds(source):
+    url_prefix, registry, url = source
+    return open_virtual_dataset(url, registry=registry, parser=HDFParser())
+
+
+def _repo(tmp_path, url_prefix, create=True):
+    config = icechunk.RepositoryConfig.default()
+    config.set_virtual_chunk_container(icechunk.VirtualChunkContainer(
+        url_prefix=url_prefix, store=icechunk.local_filesystem_store(str(tmp_path)),
+    ))
+    storage = icechunk.local_filesystem_storage(str(tmp_path / "repo"))
+    if create:
+        return icechunk.Repository.create(storage=storage, config=config), config
+    repo = icechunk.Repository.open(
+        storage=storage, config=config, authorize_virtual_chunk_access={url_prefix: None})
+    return repo, config
+
+
+def test_write_and_read_round_trip(tmp_path, source, vds):
+    url_prefix = source[0]
+    repo, _ = _repo(tmp_path, url_prefix)
+    snapshot_id = vi.write_to_icechunk(vds, repo, "round trip")
+    assert snapshot_id
+
+    repo, config = _repo(tmp_path, url_prefix, create=False)
+    ds = vi.read_from_icechunk(repo, config, url_prefix)
+    np.testing.assert_array_equal(ds.sst.values, DATA)
+
+    # Same snapshot: served from the cache
+    assert vi.read_from_icechunk(repo, config, url_prefix) is ds
+
+
+def test_rewrite_keeps_history(tmp_path, source, vds):
+    url_prefix = source[0]
+    repo, _ = _repo(tmp_path, url_prefix)
+    vi.write_to_icechunk(vds, repo, "first")
+    vi.write_to_icechunk(vds, repo, "second")
+
+    assert [s.message for s in repo.ancestry(branch="main")] == ["second", "first", "Repository initialized"]
+    repo, config = _repo(tmp_path, url_prefix, create=False)
+    np.testing.assert_array_equal(vi.read_from_icechunk(repo, config, url_prefix).sst.values, DATA)
+
+
+def test_session_batches_commit_once(tmp_path, source, vds):
+    url_prefix = source[0]
+    repo, _ = _repo(tmp_path, url_prefix)
+    session = repo.writable_session("main")
+    assert vi.write_to_icechunk(vds, repo, session=session) is None
+    assert vi.write_to_icechunk(vds, repo, append_dim="phony_dim_0", session=session) is None
+    vi.commit_session(session, "two batches")
+
+    repo, config = _repo(tmp_path, url_prefix, create=False)
+    assert [s.message for s in repo.ancestry(branch="main")] == ["two batches", "Repository initialized"]
+    ds = vi.read_from_icechunk(repo, config, url_prefix)
+    np.testing.assert_array_equal(ds.sst.values, np.concatenate([DATA, DATA]))
+
+
+def test_load_concurrently_restores_config(tmp_path, source, vds):
+    url_prefix = source[0]
+    repo, _ = _repo(tmp_path, url_prefix)
+    vi.write_to_icechunk(vds, repo)
+    repo, config = _repo(tmp_path, url_prefix, create=False)
+    ds = vi.read_from_icechunk(repo, config, url_prefix)
+
+    before = zarr.config.get("async.concurrency")
+    loaded = vi.load_concurrently(ds.sst, parallel_reads=4)
+    np.testing.assert_array_equal(loaded.values, DATA)
+    assert zarr.config.get("async.concurrency") == before
+
+
+def test_validate_urls_inside_running_loop(source):
+    url_prefix, registry, url = source
+
+    async def in_loop():
+        return vi.validate_urls([url, url_prefix + "missing.h5"], registry)
+
+    assert asyncio.run(in_loop()) == [url]
+
+
+class CountingStore:
+    """LocalStore proxy that records every request made to it."""
+
+    def __init__(self, store):
+        self.store = store
+        self.calls = []
+
+    def __getattr__(self, name):
+        attr = getattr(self.store, name)
+        if not callable(attr):
+            return attr
+
+        def counted(*args, **kwargs):
+            self.calls.append(name)
+            return attr(*args, **kwargs)
+
+        return counted
+
+
+def test_coalescing_store_request_count(tmp_path):
+    payload = bytes(range(256)) * 1024  # 256 KiB
+    (tmp_path / "blob").write_bytes(payload)
+    inner = CountingStore(LocalStore(tmp_path))
+    store = vi.CoalescingStore(inner, gap_threshold=1024, block_size=4096)
+
+    # First read of a file: one ranged GET and no HEAD
+    got = store.get_ranges("blob", starts=[0, 100], ends=[10, 200])
+    assert [bytes(b) for b in got] == [payload[0:10], payload[100:200]]
+    assert inner.calls == ["get"]
+
+    # Served from the widened block
+    assert bytes(store.get_range("blob", start=1000, length=50)) == payload[1000:1050]
+    assert inner.calls == ["get"]
+
+    # Nearby misses are merged into one request, clipped at end of file
+    got = store.get_ranges("blob", starts=[10_000, 10_500, len(payload) - 10], lengths=[10, 10, 10])
+    assert [bytes(b) for b in got] == [payload[10_000:10_010], payload[10_500:10_510], payload[-10:]]
+    assert inner.calls == ["get", "get_ranges"]
+
+    got = asyncio.run(store.get_range_async("blob", start=10_200, end=10_300))
+    assert bytes(got) == payload[10_200:10_300]
+    assert inner.calls == ["get", "get_ranges"]
+
+
+def test_coalescing_store_bounded(tmp_path):
+    for name in "abc":
+        (tmp_path / name).write_bytes(b"x" * 10_000)
+    inner = CountingStore(LocalStore(tmp_path))
+    store = vi.CoalescingStore(inner, block_size=4096, max_bytes=10_000)
+
+    for name in "abc":
+        store.get_range(name, start=0, length=10)
+    assert store._nbytes <= 10_000
+    assert list(store._spans) == ["b", "c"]
+
+    store.get_range("a", start=0, length=10)
+    assert inner.calls == ["get"] * 4
+
+
+def test_dmrpp_sidecar_checked_once_per_directory(tmp_path):
+    (tmp_path / "a.nc.dmrpp").write_text("<Dataset/>")
+    (tmp_path / "sub").mkdir()
+    inner = CountingStore(LocalStore(tmp_path))
+    url_prefix = f"file://{tmp_path}"
+    registry = ObjectStoreRegistry({url_prefix: inner})
+
+    assert vi.has_dmrpp_sidecar(f"{url_prefix}/a.nc", registry)
+    assert vi.has_dmrpp_sidecar(f"{url_prefix}/b.nc", registry)
+    assert not vi.has_dmrpp_sidecar(f"{url_prefix}/sub/a.nc", registry)
+    assert not vi.has_dmrpp_sidecar(f"{url_prefix}/sub/b.nc", registry)
+    assert inner.calls == ["head", "head"]
+
+
+def test_disk_source_cache_revalidates(tmp_path, monkeypatch):
+    monkeypatch.setattr(vi, "SOURCE_CACHE_DIR", tmp_path / "cache")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.nc").write_bytes(b"a" * 100)
+    inner = CountingStore(LocalStore(tmp_path / "src"))
+    url_prefix = "https://example.com"  # as for HTTP sources; file:// URLs resolve to absolute paths
+    registry = ObjectStoreRegistry({url_prefix: inner})
+    url = f"{url_prefix}/a.nc"
+
+    def cached():
+        cache_registry = vi._cache_sources([url], url_prefix, registry, cache="disk")
+        store, path = cache_registry.resolve(url)
+        return bytes(obstore.get(store, path).bytes())
+
+    assert cached() == b"a" * 100
+    assert inner.calls == ["head_async", "get_async"]
+
+    # Unchanged: one HEAD, no download
+    assert cached() == b"a" * 100
+    assert inner.calls == ["head_async", "get_async", "head_async"]
+
+    # Changed remotely: downloaded again
+    (tmp_path / "src" / "a.nc").write_bytes(b"b" * 50)
+    assert cached() == b"b" * 50
+    assert inner.calls[-2:] == ["head_async", "get_async"]
+
+    assert vi.prune_source_cache(max_bytes=0) == 50
+    assert not any(f.is_file() for f in (tmp_path / "cache").rglob("*"))
@@ -11,16 +11,50 @@ Key discoveries:
   - Write: Repository.create(storage, config) with VirtualChunkContainer in config
   - Read: Repository.open(storage, config, authorize_virtual_chunk_access={prefix: None})
   - Use session.store for to_icechunk() and xr.open_zarr()
+  - open_virtual_mfdataset(parallel="dask") runs one HDFParser task per URL
+    on dask workers; HTTPStore and the registry pickle fine, so no extra setup.
+    Files are parsed serially unless parallel= is passed
 
 Requirements:
-  pip install "virtualizarr[hdf,icechunk]" xarray obstore
+  pip install "virtualizarr[hdf,icechunk]" xarray obstore "dask[distributed]"
   # obspec-utils comes with virtualizarr
+  # dask is only needed for parallel="dask" in virtualize_files()
 """
 
+from __future__ import annotations
+
+import asyncio
+import bisect
+import calendar
+import functools
+import hashlib
+import itertools
+import os
+import shutil
+import threading
+import time
 import warnings
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timedelta
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import xarray as xr
+if TYPE_CHECKING:
+    import xarray as xr
+
+try:
+    import icechunk
+    import obstore
+    import zarr
+    from obspec_utils.registry import ObjectStoreRegistry
+    from obstore.exceptions import NotFoundError
+    from obstore.store import HTTPStore, LocalStore, MemoryStore
+    from zarr.core.sync import sync
+    from zarr.storage import WrapperStore
+except ImportError:
+    # Keep the URL builders usable without the virtualization stack installed
+    WrapperStore = object
 
 warnings.filterwarnings("ignore", message="Numcodecs codecs are not in the Zarr version 3 specification*")
 warnings.filterwarnings("ignore", category=FutureWarning)
@@ -51,39 +85,257 @@ PAWSEY_S3_CONFIG = {
 }
 
 
+# HTTPStore tuning for many small range reads over a WAN: keep connections
+# alive between reads and retry transient failures. reqwest negotiates HTTP/2
+# via ALPN where the server offers it; "http2_only" would break HTTP/1.1 hosts.
+HTTP_CLIENT_OPTIONS = {
+    "pool_max_idle_per_host": "32",
+    "pool_idle_timeout": "90s",
+    "timeout": "60s",
+    "connect_timeout": "5s",
+}
+HTTP_RETRY_CONFIG = {
+    "max_retries": 5,
+    "backoff": {"init_backoff": timedelta(milliseconds=100), "max_backoff": timedelta(seconds=5), "base": 2},
+    "retry_timeout": timedelta(minutes=3),
+}
+
+# Concurrent virtual-chunk GETs when reading back (load_concurrently default)
+PARALLEL_READS = 16
+
+# Local copies of source files when virtualize_files(cache_source=True, cache="disk")
+SOURCE_CACHE_DIR = Path(os.environ.get("TMPDIR", "/tmp")) / "virtualizarr-source-cache"
+# prune_source_cache() removes the oldest copies beyond this
+SOURCE_CACHE_MAX_BYTES = 20 * 1024**3
+
+
 # =============================================================================
 # Core functions
 # =============================================================================
 
 
+def _merge_ranges(ranges: list[tuple[int, int]], gap_threshold: int) -> list[tuple[int, int]]:
+    """Sort (start, end) byte ranges and merge any separated by <= gap_threshold bytes."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start - merged[-1][1] <= gap_threshold:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class CoalescingStore:
+    """
+    obspec store wrapper that merges nearby range reads into fewer requests.
+
+    HDFParser walks HDF5 metadata (superblock, B-trees, heaps) with many small
+    reads that sit close together. Ranges requested together are merged when
+    the gap is <= gap_threshold, and every fetch is widened to at least
+    block_size so the next small read is usually served from memory.
+
+    Only get_range(s) are intercepted; everything else goes to the inner store.
+    The first fetch of a file is a plain ranged GET, whose metadata gives the
+    file size used to clip later widened ranges, so no HEAD is needed. Cached
+    bytes are kept for at most `max_paths` recently read files and
+    `max_bytes` in total.
+    """
+
+    def __init__(
+        self,
+        store,
+        gap_threshold: int = 32 * 1024,
+        block_size: int = 64 * 1024,
+        max_paths: int = 8,
+        max_bytes: int = 64 * 1024 * 1024,
+    ):
+        self._store = store
+        self.gap_threshold = gap_threshold
+        self.block_size = block_size
+        self.max_paths = max_paths
+        self.max_bytes = max_bytes
+        self._spans = OrderedDict()  # path -> sorted, disjoint [(start, end, bytes)]
+        self._starts = {}  # path -> span starts, for bisect
+        self._sizes = {}
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._store, name)
+
+    def __getstate__(self):
+        return {
+            "store": self._store,
+            "gap_threshold": self.gap_threshold,
+            "block_size": self.block_size,
+            "max_paths": self.max_paths,
+            "max_bytes": self.max_bytes,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _lookup(self, path: str, start: int, end: int):
+        """Cached bytes for [start, end) or None; call with the lock held."""
+        starts = self._starts.get(path)
+        if not starts:
+            return None
+        i = bisect.bisect_right(starts, start) - 1
+        if i < 0:
+            return None
+        span_start, span_end, data = self._spans[path][i]
+        if end > span_end:
+            return None
+        return memoryview(data)[start - span_start : end - span_start]
+
+    def _plan(self, path: str, ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        """Merged, block-widened ranges still needed to serve `ranges`."""
+        with self._lock:
+            missing = [(s, e) for s, e in ranges if self._lookup(path, s, e) is None]
+            size = self._sizes.get(path)
+        widened = [(s, max(e, s + self.block_size)) for s, e in missing]
+        if size is not None:
+            widened = [(s, min(e, size)) for s, e in widened]
+        return _merge_ranges(widened, self.gap_threshold)
+
+    def _insert(self, path: str, start: int, data: bytes) -> None:
+        """Add a span, merging it with any it overlaps or touches."""
+        spans = self._spans.setdefault(path, [])
+        starts = self._starts.setdefault(path, [])
+        end = start + len(data)
+        i = bisect.bisect_right(starts, start) - 1
+        if i >= 0 and spans[i][1] >= start:
+            left_start, left_end, left = spans[i]
+            data = left[: start - left_start] + data + left[end - left_start :]
+            start, end = left_start, max(end, left_end)
+        else:
+            i += 1
+        j = i
+        while j < len(spans) and spans[j][0] <= end:
+            right_start, right_end, right = spans[j]
+            if right_end > end:
+                data += right[end - right_start :]
+                end = right_end
+            j += 1
+        self._nbytes += len(data) - sum(len(d) for _, _, d in spans[i:j])
+        spans[i:j] = [(start, end, data)]
+        starts[i:j] = [start]
+
+    def _store_spans(self, path: str, plan: list[tuple[int, int]], buffers, size=None) -> None:
+        with self._lock:
+            if size is not None:
+                self._sizes[path] = size
+            for (start, _), buf in zip(plan, buffers):
+                self._insert(path, start, bytes(buf))
+            self._spans.move_to_end(path)
+            while len(self._spans) > 1 and (
+                len(self._spans) > self.max_paths or self._nbytes > self.max_bytes
+            ):
+                old, spans = self._spans.popitem(last=False)
+                del self._starts[old]
+                self._sizes.pop(old, None)
+                self._nbytes -= sum(len(d) for _, _, d in spans)
+
+    def _read(self, path: str, ranges: list[tuple[int, int]]):
+        with self._lock:
+            return [self._lookup(path, s, e) for s, e in ranges]
+
+    @staticmethod
+    def _as_ranges(starts, ends, lengths) -> list[tuple[int, int]]:
+        if ends is None:
+            ends = [s + n for s, n in zip(starts, lengths)]
+        return list(zip(starts, ends))
+
+    def get_ranges(self, path: str, *, starts, ends=None, lengths=None):
+        ranges = self._as_ranges(starts, ends, lengths)
+        plan = self._plan(path, ranges)
+        if plan and path not in self._sizes:
+            # One ranged GET first: its metadata carries the file size
+            result = self._store.get(path, options={"range": plan[0]})
+            self._store_spans(path, plan[:1], [result.bytes()], size=result.meta["size"])
+            plan = self._plan(path, ranges)
+        if plan:
+            buffers = self._store.get_ranges(path, starts=[s for s, _ in plan], ends=[e for _, e in plan])
+            self._store_spans(path, plan, buffers)
+        return self._read(path, ranges)
+
+    def get_range(self, path: str, *, start: int, end: int | None = None, length: int | None = None):
+        end = start + length if end is None else end
+        return self.get_ranges(path, starts=[start], ends=[end])[0]
+
+    async def get_ranges_async(self, path: str, *, starts, ends=None, lengths=None):
+        ranges = self._as_ranges(starts, ends, lengths)
+        plan = self._plan(path, ranges)
+        if plan and path not in self._sizes:
+            result = await self._store.get_async(path, options={"range": plan[0]})
+            data = await result.bytes_async()
+            self._store_spans(path, plan[:1], [data], size=result.meta["size"])
+            plan = self._plan(path, ranges)
+        if plan:
+            buffers = await self._store.get_ranges_async(
+                path, starts=[s for s, _ in plan], ends=[e for _, e in plan]
+            )
+            self._store_spans(path, plan, buffers)
+        return self._read(path, ranges)
+
+    async def get_range_async(
+        self, path: str, *, start: int, end: int | None = None, length: int | None = None
+    ):
+        end = start + length if end is None else end
+        return (await self.get_ranges_async(path, starts=[start], ends=[end]))[0]
+
+
+_HTTP_STORES = {}
+
+
+def get_http_store(url_prefix: str):
+    """
+    Return a tuned HTTPStore for url_prefix, shared for the life of the process.
+
+    Reusing the store reuses its connection pool, so later virtualize_files()
+    calls skip the TCP + TLS handshakes.
+    """
+    key = url_prefix.rstrip("/")
+    if key not in _HTTP_STORES:
+        _HTTP_STORES[key] = HTTPStore.from_url(
+            key, client_options=HTTP_CLIENT_OPTIONS, retry_config=HTTP_RETRY_CONFIG
+        )
+    return _HTTP_STORES[key]
+
+
+@functools.lru_cache(maxsize=16)
 def create_registry_and_parser(url_prefix: str):
     """
     Create obstore registry and HDF parser for virtualizing files.
+
+    Cached per url_prefix so repeated virtualize_files() calls (e.g. per batch)
+    share one registry. Treat the result as read-only.
     
     Args:
         url_prefix: Base URL like "https://thredds.nci.org.au"
     """
-    from obstore.store import HTTPStore
-    from obspec_utils.registry import ObjectStoreRegistry
     from virtualizarr.parsers import HDFParser
 
     # Plain URL prefix, not regex!
-    http_store = HTTPStore.from_url(url_prefix.rstrip("/"))
+    http_store = CoalescingStore(get_http_store(url_prefix))
     registry = ObjectStoreRegistry({url_prefix.rstrip("/"): http_store})
     parser = HDFParser()
 
     return registry, parser
 
 
+@functools.lru_cache(maxsize=8)
 def create_icechunk_config(url_prefix: str):
     """
     Create Icechunk RepositoryConfig with VirtualChunkContainer.
+
+    Cached per url_prefix; the config is shared between repos, so don't mutate it.
     
     Args:
         url_prefix: URL prefix for virtual chunk references (include trailing slash)
     """
-    import icechunk
-
     config = icechunk.RepositoryConfig.default()
     container = icechunk.VirtualChunkContainer(
         url_prefix=url_prefix,
@@ -94,14 +346,18 @@ def create_icechunk_config(url_prefix: str):
     return config
 
 
-def create_local_repo(path: str, url_prefix: str, create_new: bool = True):
+def create_local_repo(path: str, url_prefix: str, create_new: bool = False, force: bool = False):
     """
-    Create or open Icechunk repository on local filesystem.
-    """
-    import icechunk
-    import shutil
+    Open or create Icechunk repository on local filesystem.
 
-    if create_new and Path(path).exists():
+    Existing repos are reused so re-runs commit on top of the previous snapshot
+    instead of rewriting every manifest.
+
+    Args:
+        create_new: Always create (fails if the repo already exists)
+        force: Delete any existing repo first (wipes all snapshots)
+    """
+    if force and Path(path).exists():
         shutil.rmtree(path)
 
     storage = icechunk.local_filesystem_storage(path)
@@ -110,7 +366,7 @@ def create_local_repo(path: str, url_prefix: str, create_new: bool = True):
     if create_new:
         repo = icechunk.Repository.create(storage=storage, config=config)
     else:
-        repo = icechunk.Repository.open(
+        repo = icechunk.Repository.open_or_create(
             storage=storage,
             config=config,
             authorize_virtual_chunk_access={url_prefix: None},  # Anonymous HTTP
@@ -127,8 +383,6 @@ def create_pawsey_repo(bucket: str, prefix: str, url_prefix: str, create_new: bo
         AWS_ACCESS_KEY_ID
         AWS_SECRET_ACCESS_KEY
     """
-    import icechunk
-
     storage = icechunk.s3_storage(
         bucket=bucket,
         prefix=prefix,
@@ -151,7 +405,248 @@ def create_pawsey_repo(bucket: str, prefix: str, url_prefix: str, create_new: bo
     return repo, config
 
 
-def virtualize_files(urls: list[str], url_prefix: str, concat_dim: str = "time", combine: str = "nested"):
+async def _fetch_many(store, paths: list[str], concurrency: int = 16) -> list[bytes]:
+    """
+    Fetch whole objects concurrently, at most `concurrency` requests in flight.
+    """
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _fetch(path):
+        async with sem:
+            result = await store.get_async(path)
+            return await result.bytes_async()
+
+    return await asyncio.gather(*(_fetch(p) for p in paths))
+
+
+async def _head_many(store, paths: list[str], concurrency: int = 32) -> list[dict]:
+    """
+    HEAD objects concurrently, at most `concurrency` requests in flight.
+    """
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _head(path):
+        async with sem:
+            return await store.head_async(path)
+
+    return await asyncio.gather(*(_head(p) for p in paths))
+
+
+def prune_source_cache(
+    max_bytes: int = SOURCE_CACHE_MAX_BYTES, max_age: timedelta | None = None, keep=()
+) -> int:
+    """
+    Delete cached source copies, oldest first, until SOURCE_CACHE_DIR fits in max_bytes.
+
+    Copies cached more than max_age ago are deleted regardless; files in keep
+    never are. Returns the number of bytes freed.
+    """
+    if not SOURCE_CACHE_DIR.exists():
+        return 0
+    keep = {Path(k) for k in keep}
+    files = sorted(
+        ((f.stat(), f) for f in SOURCE_CACHE_DIR.rglob("*") if f.is_file()),
+        key=lambda item: item[0].st_ctime,
+    )
+    total = sum(st.st_size for st, _ in files)
+    cutoff = None if max_age is None else time.time() - max_age.total_seconds()
+    freed = 0
+    for st, f in files:
+        expired = cutoff is not None and st.st_ctime < cutoff
+        if f in keep or not (expired or total - freed > max_bytes):
+            continue
+        f.unlink(missing_ok=True)
+        freed += st.st_size
+    return freed
+
+
+def _cache_sources(
+    urls: list[str], url_prefix: str, registry, cache: str = "memory", concurrency: int = 16
+):
+    """
+    Fetch each source file with a single GET and return a registry serving the copies.
+
+    HDFParser walks the superblock, B-trees and heaps with many small range
+    reads; over a WAN each one is a round trip. Parsing from a whole-file copy
+    collapses those into one request per file.
+
+    The cache store is registered under the same URL prefix as the remote store,
+    so the virtual references still point at the original URLs.
+
+    Args:
+        urls: URLs to fetch (all must resolve through registry)
+        url_prefix: Prefix the remote store is registered under
+        registry: ObjectStoreRegistry for the remote store
+        cache: 'memory' (MemoryStore) or 'disk' (LocalStore under SOURCE_CACHE_DIR,
+            reused across runs)
+        concurrency: Maximum simultaneous downloads
+
+    Disk copies are checked against a HEAD of the remote object: a copy is
+    only reused while its size and modification time match, and the cache is
+    pruned to SOURCE_CACHE_MAX_BYTES afterwards.
+    """
+    prefix = url_prefix.rstrip("/")
+
+    if cache == "disk":
+        root = SOURCE_CACHE_DIR / hashlib.sha1(prefix.encode()).hexdigest()[:16]
+        root.mkdir(parents=True, exist_ok=True)
+        cache_store = LocalStore(root)
+    elif cache == "memory":
+        cache_store = MemoryStore()
+    else:
+        raise ValueError(f"cache must be 'memory' or 'disk', got {cache!r}")
+
+    store = registry.resolve(urls[0])[0]
+    paths = [registry.resolve(url)[1] for url in urls]
+    if cache == "disk":
+        # zarr's sync() runs on its own loop thread, so this also works under Jupyter
+        mtimes = {}
+        for path, meta in zip(paths, sync(_head_many(store, paths, concurrency))):
+            local = root / path
+            mtime = meta["last_modified"].timestamp()
+            if local.exists():
+                st = local.stat()
+                if st.st_size == meta["size"] and abs(st.st_mtime - mtime) < 1:
+                    continue
+            mtimes[path] = mtime
+        paths = list(mtimes)
+
+    # Keyed by the original path so the registry URL scheme is unchanged.
+    # LocalStore writes to a temporary file and renames it into place
+    for path, data in zip(paths, sync(_fetch_many(store, paths, concurrency))):
+        obstore.put(cache_store, path, data)
+        if cache == "disk":
+            os.utime(root / path, (mtimes[path], mtimes[path]))
+
+    if cache == "disk":
+        prune_source_cache(keep=[root / registry.resolve(url)[1] for url in urls])
+
+    return ObjectStoreRegistry({prefix: cache_store})
+
+
+def _cache_then_parse(
+    url: str, url_prefix: str, registry, parser, cache: str = "memory", **open_kwargs
+):
+    """
+    Virtualize one file by parsing a whole-file copy instead of the remote object.
+    """
+    from virtualizarr import open_virtual_dataset
+
+    cache_registry = _cache_sources([url], url_prefix, registry, cache=cache)
+    return open_virtual_dataset(url, registry=cache_registry, parser=parser, **open_kwargs)
+
+
+async def _prevalidate(store, paths: list[str], concurrency: int = 32) -> list[str]:
+    """
+    HEAD each path concurrently and return those that exist, in order.
+    """
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _head(path):
+        async with sem:
+            try:
+                await store.head_async(path)
+                return path
+            except FileNotFoundError:
+                return None
+
+    return [p for p in await asyncio.gather(*(_head(p) for p in paths)) if p is not None]
+
+
+def validate_urls(urls: list[str], registry, concurrency: int = 32) -> list[str]:
+    """
+    Drop URLs that don't exist, checked with parallel HEAD requests.
+
+    Catches a missing file before any parsing work is spent, and warms the
+    connection pool for the GETs that follow.
+    """
+    store = registry.resolve(urls[0])[0]
+    url_for_path = {registry.resolve(url)[1]: url for url in urls}
+    found = sync(_prevalidate(store, list(url_for_path), concurrency))
+    valid = [url_for_path[p] for p in found]
+
+    for url in sorted(set(urls) - set(valid)):
+        print(f"Skipping missing file: {url}")
+    if not valid:
+        raise FileNotFoundError(f"None of the {len(urls)} URLs exist (first: {urls[0]})")
+    return valid
+
+
+# Directory URL -> whether its files ship .dmrpp sidecars
+_DMRPP_SIDECARS = {}
+
+
+def has_dmrpp_sidecar(url: str, registry) -> bool:
+    """
+    Check whether a NASA-style DMR++ sidecar (url + ".dmrpp") exists.
+
+    The answer is cached per directory, so batches from one collection pay
+    for a single HEAD.
+    """
+    directory = url.rsplit("/", 1)[0]
+    if directory not in _DMRPP_SIDECARS:
+        store, path = registry.resolve(url + ".dmrpp")
+        try:
+            store.head(path)
+        except (NotFoundError, FileNotFoundError):  # HTTP/S3 stores; LocalStore
+            _DMRPP_SIDECARS[directory] = False
+        else:
+            _DMRPP_SIDECARS[directory] = True
+    return _DMRPP_SIDECARS[directory]
+
+
+def get_dask_client(max_workers: int = 16):
+    """
+    Return the active dask distributed client, or start a local one.
+
+    Reusing the client means repeated virtualize_files() calls share workers
+    instead of paying cluster startup each time.
+    """
+    from dask.distributed import Client, get_client
+
+    try:
+        return get_client()
+    except ValueError:
+        return Client(n_workers=max_workers, threads_per_worker=2)
+
+
+def _tree_combine(
+    urls: list[str], registry, parser, concat_dim: str, max_workers: int = 16, **open_kwargs
+):
+    """
+    Open files on dask workers and concatenate them pairwise with dask.bag.
+
+    open_virtual_mfdataset ships every file's references back to the driver
+    and concatenates serially; folding on the bag concatenates within each
+    partition on the workers and then reduces the partial results as a tree.
+    """
+    import dask.bag as db
+    import xarray as xr
+    from virtualizarr import open_virtual_dataset
+
+    def _concat(a, b):
+        return xr.concat([a, b], dim=concat_dim, coords="minimal", compat="override")
+
+    bag = db.from_sequence(urls, npartitions=min(len(urls), max_workers)).map(
+        lambda url: open_virtual_dataset(url, registry=registry, parser=parser, **open_kwargs)
+    )
+    return bag.fold(_concat).compute()
+
+
+def virtualize_files(
+    urls: list[str],
+    url_prefix: str,
+    concat_dim: str = "time",
+    combine: str = "nested",
+    parallel=None,
+    max_workers: int = 16,
+    cache_source: bool = False,
+    cache: str = "memory",
+    parser_override=None,
+    load_coords: bool = True,
+    validate: bool = True,
+    detect_dmrpp: bool = False,
+):
     """
     Virtualize multiple files into a single virtual dataset.
     
@@ -159,66 +654,272 @@ def virtualize_files(urls: list[str], url_prefix: str, concat_dim: str = "time",
         urls: List of URLs to virtualize
         url_prefix: Base URL prefix (e.g., "https://thredds.nci.org.au")
         concat_dim: Dimension to concatenate along
-        combine: Combine method ('nested' or 'by_coords')
+        combine: Combine method ('nested', 'by_coords', or 'tree' to concatenate
+            along concat_dim on dask workers, for hundreds of files)
+        parallel: Executor for per-file parsing: 'dask', 'lithops', an Executor
+            class such as ThreadPoolExecutor, or None for serial
+        max_workers: Workers for the local dask cluster, started only for
+            parallel='dask' or combine='tree' when no client is running
+        cache_source: Download each file whole before parsing (fast for many
+            small files like OISST, wasteful for large ones like BRAN)
+        cache: Where cached sources live: 'memory' or 'disk' (kept across runs)
+        parser_override: Parser to use instead of HDFParser / sidecar detection
+        load_coords: False keeps every variable virtual, including the 1-D
+            dimension coordinates virtualizarr otherwise loads (and Icechunk
+            then stores inline)
+        validate: Drop URLs that don't exist (see validate_urls) before
+            parsing; pass False when the caller has already checked them
+        detect_dmrpp: Look for a .dmrpp sidecar next to the first file (one
+            HEAD per directory). If there is one, the whole collection is
+            assumed to ship them and DMRPPParser reads the ~KB XML instead
+            of walking HDF5.
     """
     from virtualizarr import open_virtual_dataset, open_virtual_mfdataset
+    from virtualizarr.parsers import DMRPPParser
 
     registry, parser = create_registry_and_parser(url_prefix)
-
-    if len(urls) == 1:
-        vds = open_virtual_dataset(urls[0], registry=registry, parser=parser)
+    open_kwargs = {} if load_coords else {"loadable_variables": []}
+
+    if validate:
+        urls = validate_urls(urls, registry)
+
+    if parser_override is not None:
+        parser = parser_override
+    elif detect_dmrpp and has_dmrpp_sidecar(urls[0], registry):
+        parser = DMRPPParser()
+        urls = [url + ".dmrpp" for url in urls]
+        cache_source = False
+
+    if len(urls) == 1 and cache_source:
+        vds = _cache_then_parse(urls[0], url_prefix, registry, parser, cache=cache, **open_kwargs)
+    elif len(urls) == 1:
+        vds = open_virtual_dataset(urls[0], registry=registry, parser=parser, **open_kwargs)
     else:
-        vds = open_virtual_mfdataset(
-            urls,
-            registry=registry,
-            parser=parser,
-            concat_dim=concat_dim,
-            combine=combine,
-        )
+        if cache_source:
+            # A MemoryStore only exists in this process, so parse here
+            if cache == "memory" and combine == "tree":
+                raise ValueError("combine='tree' parses on workers; use cache='disk'")
+            registry = _cache_sources(urls, url_prefix, registry, cache=cache)
+            if cache == "memory":
+                parallel = None
+        if combine == "tree":
+            get_dask_client(max_workers)
+            vds = _tree_combine(urls, registry, parser, concat_dim, max_workers, **open_kwargs)
+        else:
+            if parallel == "dask":
+                get_dask_client(max_workers)
+            vds = open_virtual_mfdataset(
+                urls,
+                registry=registry,
+                parser=parser,
+                concat_dim=concat_dim,
+                combine=combine,
+                parallel=parallel or False,
+                **open_kwargs,
+            )
 
     return vds
 
 
-def write_to_icechunk(vds: xr.Dataset, repo, message: str = "Virtualized dataset"):
+def write_to_icechunk(
+    vds: xr.Dataset,
+    repo,
+    message: str = "Virtualized dataset",
+    append_dim: str | None = None,
+    session=None,
+):
     """
     Write virtual dataset to Icechunk repository.
+
+    With append_dim, vds is appended to the existing arrays along that dimension,
+    so the commit only carries the new references. Without it, whatever the
+    repo already holds is replaced, as a new snapshot on top of its history.
+
+    With session, vds is written into that writable session and nothing is
+    committed (returns None); the caller batches writes and calls
+    commit_session() once.
     """
-    session = repo.writable_session("main")
-    vds.virtualize.to_icechunk(session.store)
-    snapshot_id = session.commit(message)
-    return snapshot_id
+    commit = session is None
+    if commit:
+        session = repo.writable_session("main")
+    if append_dim is None:
+        sync(session.store.delete_dir(""))
+    vds.virtualize.to_icechunk(session.store, append_dim=append_dim)
+    return commit_session(session, message) if commit else None
+
+
+def commit_session(session, message: str):
+    """
+    Commit a writable session and return the snapshot id.
+
+    Icechunk stores don't support zarr consolidated metadata; array metadata
+    already lives in the snapshot, so there is nothing to consolidate.
+    """
+    return session.commit(message)
+
+
+@dataclass(frozen=True)
+class PrefetchConfig:
+    """Settings for PrefetchingStore."""
 
+    lookahead: int = 4  # chunks fetched ahead once a stride is detected
+    cache_mb: int = 256  # cap on prefetched bytes held in memory
 
-def read_from_icechunk(repo, config, url_prefix: str) -> xr.Dataset:
+
+def _split_chunk_key(key: str):
+    """Split 'sst/c/0/3/1' into ('sst', (0, 3, 1)); None for metadata keys."""
+    parts = key.split("/")
+    if "c" not in parts:
+        return None
+    i = len(parts) - 1 - parts[::-1].index("c")
+    idx = parts[i + 1 :]
+    if not idx or not all(p.isdigit() for p in idx):
+        return None
+    return "/".join(parts[:i]), tuple(int(p) for p in idx)
+
+
+class PrefetchingStore(WrapperStore):
+    """
+    zarr store wrapper that prefetches the next chunks of a strided read.
+
+    Each virtual chunk read is an HTTP GET to the source file. When two
+    consecutive whole-chunk reads of an array differ by the same step as the
+    read before (e.g. c/0/0/0 -> c/1/0/0 -> c/2/0/0 while walking time), the
+    next `lookahead` chunks along that step are requested in the background and
+    held in an LRU cache until read.
+    """
+
+    def __init__(self, store, config: PrefetchConfig | None = None):
+        super().__init__(store)
+        self.config = config or PrefetchConfig()
+        self._last = {}  # array path -> (last index, last step)
+        self._cache = OrderedDict()  # key -> Buffer
+        self._cache_bytes = 0
+        self._pending = {}  # key -> asyncio.Task
+
+    def _with_store(self, store):
+        return type(self)(store, self.config)
+
+    def _remember(self, key: str, value) -> None:
+        if value is None or key in self._cache:
+            return
+        self._cache[key] = value
+        self._cache_bytes += len(value)
+        while self._cache_bytes > self.config.cache_mb * 2**20 and self._cache:
+            _, old = self._cache.popitem(last=False)
+            self._cache_bytes -= len(old)
+
+    async def _prefetch(self, key: str, prototype) -> None:
+        # Best effort: on failure the real read refetches and raises
+        try:
+            self._remember(key, await self._store.get(key, prototype))
+        except Exception:
+            pass
+        finally:
+            self._pending.pop(key, None)
+
+    def _predict(self, key: str, prototype) -> None:
+        parsed = _split_chunk_key(key)
+        if parsed is None:
+            return
+        array, idx = parsed
+        last_idx, last_step = self._last.get(array, (None, None))
+        step = None if last_idx is None else tuple(a - b for a, b in zip(idx, last_idx))
+        self._last[array] = (idx, step)
+        if step is None or step != last_step or not any(step):
+            return
+        for k in range(1, self.config.lookahead + 1):
+            nxt = tuple(i + k * d for i, d in zip(idx, step))
+            if min(nxt) < 0:
+                break
+            nxt_key = "/".join([array, "c", *map(str, nxt)]).lstrip("/")
+            if nxt_key not in self._cache and nxt_key not in self._pending:
+                self._pending[nxt_key] = asyncio.create_task(self._prefetch(nxt_key, prototype))
+
+    async def get(self, key, prototype, byte_range=None):
+        if byte_range is not None:
+            return await self._store.get(key, prototype, byte_range)
+        if key in self._cache:
+            value = self._cache.pop(key)
+            self._cache_bytes -= len(value)
+        elif key in self._pending:
+            await asyncio.shield(self._pending[key])
+            value = self._cache.pop(key, None)
+            if value is None:
+                value = await self._store.get(key, prototype)
+            else:
+                self._cache_bytes -= len(value)
+        else:
+            value = await self._store.get(key, prototype)
+        self._predict(key, prototype)
+        return value
+
+
+_DATASET_CACHE = OrderedDict()  # (snapshot_id, prefetch) -> xr.Dataset
+
+
+def read_from_icechunk(
+    repo,
+    config,
+    url_prefix: str,
+    prefetch: PrefetchConfig | None = None,
+) -> xr.Dataset:
     """
     Read dataset from Icechunk repository.
     
     Note: Must reopen repo with authorize_virtual_chunk_access for reads.
+
+    Pass prefetch=PrefetchConfig() to read ahead along strided access
+    (e.g. sampling one time step after another).
+
+    Snapshots are immutable, so the opened dataset is cached by snapshot id
+    and repeated reads of the same snapshot skip re-parsing metadata.
     """
-    import icechunk
+    import xarray as xr
 
     # For reads, we need authorize_virtual_chunk_access
     # The repo passed in might be from create(), so we get storage and reopen
     session = repo.readonly_session("main")
-    ds = xr.open_zarr(session.store, consolidated=False)
+    key = (session.snapshot_id, prefetch)
+    if key in _DATASET_CACHE:
+        _DATASET_CACHE.move_to_end(key)
+        return _DATASET_CACHE[key]
+
+    store = session.store if prefetch is None else PrefetchingStore(session.store, prefetch)
+    ds = xr.open_zarr(store, consolidated=False)
+    _DATASET_CACHE[key] = ds
+    if len(_DATASET_CACHE) > 8:
+        _DATASET_CACHE.popitem(last=False)
     return ds
 
 
+def load_concurrently(obj, parallel_reads: int = PARALLEL_READS):
+    """
+    Load an xarray object with up to `parallel_reads` chunk GETs in flight.
+
+    zarr fans a read out over its chunks up to the async.concurrency setting
+    (10 by default). Each virtual chunk is a GET against the source file, so
+    more in flight hides WAN latency; the setting is raised only for this load.
+    """
+    with zarr.config.set({"async.concurrency": parallel_reads}):
+        return obj.load()
+
+
 # =============================================================================
 # OISST workflows
 # =============================================================================
 
 
-def get_oisst_urls(year: int, month: int) -> list[str]:
-    """Generate OISST URLs for a given year/month."""
-    import calendar
-    
+@functools.lru_cache(maxsize=64)
+def _oisst_urls(year: int, month: int) -> tuple[str, ...]:
     days_in_month = calendar.monthrange(year, month)[1]
-    urls = []
-    for day in range(1, days_in_month + 1):
-        url = f"{OISST_CONFIG['base_url']}/{year}{month:02d}/oisst-avhrr-v02r01.{year}{month:02d}{day:02d}.nc"
-        urls.append(url)
-    return urls
+    base = f"{OISST_CONFIG['base_url']}/{year}{month:02d}/oisst-avhrr-v02r01.{year}{month:02d}"
+    return tuple(sorted({f"{base}{day:02d}.nc" for day in range(1, days_in_month + 1)}))
+
+
+def get_oisst_urls(year: int, month: int) -> list[str]:
+    """Generate OISST URLs for a given year/month (sorted, unique)."""
+    return list(_oisst_urls(year, month))
 
 
 def test_oisst_single_file(output_path: str = "/tmp/test_oisst.icechunk"):
@@ -233,7 +934,7 @@ def test_oisst_single_file(output_path: str = "/tmp/test_oisst.icechunk"):
     print(f"Virtual dataset: {vds.dims}")
 
     print(f"\nWriting to: {output_path}")
-    repo, config = create_local_repo(output_path, url_prefix, create_new=True)
+    repo, config = create_local_repo(output_path, url_prefix)
     snapshot_id = write_to_icechunk(vds, repo, "Test OISST single file")
     print(f"Committed: {snapshot_id}")
 
@@ -250,20 +951,30 @@ def test_oisst_single_file(output_path: str = "/tmp/test_oisst.icechunk"):
     return ds
 
 
-def virtualize_oisst_month(year: int, month: int, output_path: str):
+def virtualize_oisst_month(
+    year: int, month: int, output_path: str, append: bool = False, parallel=None
+):
     """
     Virtualize a full month of OISST data.
+
+    With append=True the month is added along time to an existing repo at
+    output_path instead of replacing it. parallel is passed to
+    virtualize_files(), e.g. "dask" to parse on a local cluster.
     """
     urls = get_oisst_urls(year, month)
     url_prefix = OISST_CONFIG["url_prefix"]
 
     print(f"Virtualizing {len(urls)} OISST files for {year}-{month:02d}")
-    vds = virtualize_files(urls, url_prefix, concat_dim="time", combine="nested")
+    vds = virtualize_files(
+        urls, url_prefix, concat_dim="time", combine="nested", parallel=parallel, cache_source=True, cache="disk"
+    )
     print(f"Virtual dataset: {vds.dims}")
 
     print(f"\nWriting to: {output_path}")
-    repo, config = create_local_repo(output_path, url_prefix, create_new=True)
-    snapshot_id = write_to_icechunk(vds, repo, f"OISST {year}-{month:02d}")
+    repo, config = create_local_repo(output_path, url_prefix)
+    snapshot_id = write_to_icechunk(
+        vds, repo, f"OISST {year}-{month:02d}", append_dim="time" if append else None
+    )
     print(f"Committed: {snapshot_id}")
 
     return snapshot_id
@@ -274,14 +985,17 @@ def virtualize_oisst_month(year: int, month: int, output_path: str):
 # =============================================================================
 
 
+@functools.lru_cache(maxsize=64)
+def _bran_urls(variable: str, years: range) -> tuple[str, ...]:
+    base = f"{BRAN_CONFIG['base_url']}/daily/{variable}"
+    return tuple(
+        sorted({f"{base}_{year}_{month:02d}.nc" for year, month in itertools.product(years, range(1, 13))})
+    )
+
+
 def get_bran_urls(variable: str, years: range) -> list[str]:
-    """Generate BRAN2023 URLs for a variable across years."""
-    urls = []
-    for year in years:
-        for month in range(1, 13):
-            url = f"{BRAN_CONFIG['base_url']}/daily/{variable}_{year}_{month:02d}.nc"
-            urls.append(url)
-    return urls
+    """Generate BRAN2023 URLs for a variable across years (sorted, unique)."""
+    return list(_bran_urls(variable, years))
 
 
 def test_bran_single_file(output_path: str = "/tmp/test_bran.icechunk"):
@@ -297,7 +1011,7 @@ def test_bran_single_file(output_path: str = "/tmp/test_bran.icechunk"):
     print(f"Virtual dataset: {vds.dims}")
 
     print(f"\nWriting to: {output_path}")
-    repo, config = create_local_repo(output_path, url_prefix, create_new=True)
+    repo, config = create_local_repo(output_path, url_prefix)
     snapshot_id = write_to_icechunk(vds, repo, "Test BRAN ocean_temp January 2024")
     print(f"Committed: {snapshot_id}")
 
@@ -313,21 +1027,54 @@ def test_bran_single_file(output_path: str = "/tmp/test_bran.icechunk"):
     return ds
 
 
-def virtualize_bran_variable(variable: str, years: range, output_path: str):
+def _chunked(items: list, size: int):
+    """Yield successive slices of `items` with at most `size` elements."""
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def virtualize_bran_variable(
+    variable: str,
+    years: range,
+    output_path: str,
+    batch_size: int = 12,
+    commit_every: int = 0,
+    parallel=None,
+):
     """
     Virtualize a BRAN variable across multiple years.
+
+    Files are virtualized `batch_size` at a time and appended along Time into
+    one writable session, so memory is bounded by one batch and the snapshot
+    cost is paid once. commit_every=N also commits after every N batches, so a
+    failure only loses the batches since the last commit. parallel is passed
+    to virtualize_files() for each batch.
     """
-    urls = get_bran_urls(variable, years)
     url_prefix = BRAN_CONFIG["url_prefix"]
+    registry, _ = create_registry_and_parser(url_prefix)
+    urls = validate_urls(get_bran_urls(variable, years), registry)
+    batches = list(_chunked(urls, batch_size))
+    label = f"BRAN2023 {variable} {years.start}-{years.stop-1}"
 
-    print(f"Virtualizing {len(urls)} BRAN files for {variable}")
+    print(f"Virtualizing {len(urls)} BRAN files for {variable} in {len(batches)} batches")
     print("(This will take a while over HTTP - consider running on NCI)")
-    vds = virtualize_files(urls, url_prefix, concat_dim="Time", combine="nested")
-    print(f"Virtual dataset: {vds.dims}")
 
     print(f"\nWriting to: {output_path}")
-    repo, config = create_local_repo(output_path, url_prefix, create_new=True)
-    snapshot_id = write_to_icechunk(vds, repo, f"BRAN2023 {variable} {years.start}-{years.stop-1}")
+    repo, config = create_local_repo(output_path, url_prefix)
+    session = repo.writable_session("main")
+
+    for i, batch in enumerate(batches):
+        print(f"Batch {i + 1}/{len(batches)}: {len(batch)} files")
+        vds = virtualize_files(
+            batch, url_prefix, concat_dim="Time", combine="nested", parallel=parallel, validate=False
+        )
+        write_to_icechunk(vds, repo, append_dim="Time" if i > 0 else None, session=session)
+        if commit_every and (i + 1) % commit_every == 0 and i + 1 < len(batches):
+            snapshot_id = commit_session(session, f"{label} batches 1-{i + 1}")
+            print(f"Committed: {snapshot_id}")
+            session = repo.writable_session("main")
+
+    snapshot_id = commit_session(session, label)
     print(f"Committed: {snapshot_id}")
 
     return snapshot_id